@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cliente asíncrono para la API de n8n (requiere aiohttp)
+Un solo event loop, un pool de conexiones compartido y un semáforo que
+limita las peticiones en vuelo: pensado para pull/push/status con cientos
+de workflows
+"""
+import asyncio
+import time
+import n8n_client
+from json_io import dumps_compact, loads
+from n8n_client import COMPRESSION_REJECTED, IDEMPOTENT_METHODS, N8nClientBase
+
+try:
+    import aiohttp
+except ImportError:  # dependencia opcional, solo para --engine async
+    aiohttp = None
+
+# Peticiones simultáneas por defecto
+DEFAULT_CONCURRENCY = 32
+
+class AsyncN8nClient(N8nClientBase):
+    """
+    Mismos métodos que N8nClient, como corrutinas
+
+    Uso:
+        async with AsyncN8nClient(concurrency=64) as client:
+            workflow = await client.get_workflow(workflow_id)
+    """
+
+    def __init__(self, rate_limit=None, concurrency=DEFAULT_CONCURRENCY):
+        if aiohttp is None:
+            raise Exception("El motor async requiere aiohttp: pip3 install aiohttp")
+        super().__init__(rate_limit=rate_limit)
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Crea la sesión HTTP (debe llamarse dentro del event loop)"""
+        if self.session is None:
+            connect_timeout, read_timeout = self.timeout
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout,
+                                              sock_read=read_timeout)
+            )
+
+    async def close(self):
+        """Cierra la sesión y sus conexiones"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _throttle(self):
+        """Espera (sin bloquear el event loop) a que el limitador lo permita"""
+        if self.rate_limiter:
+            wait = self.rate_limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    async def _request(self, method, path, idempotent=None, **kwargs):
+        """Hace una petición y devuelve el JSON de la respuesta (mismos reintentos que N8nClient)"""
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        await self.open()
+        url = f"{self.base_url}{path}"
+        raw = None
+        if 'json' in kwargs:
+            # Serializamos aquí: JSON compacto, gzip si procede y bytes contados
+            raw = dumps_compact(kwargs.pop('json'))
+            kwargs['data'], kwargs['headers'] = self._encode_body(raw)
+        compressed = 'Content-Encoding' in kwargs.get('headers', {})
+        probing = False
+        attempt = 0
+        started = time.perf_counter()
+
+        while True:
+            async with self.semaphore:
+                await self._throttle()
+                try:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        self._count_sent(raw, kwargs.get('data'))
+                        if compressed and response.status in COMPRESSION_REJECTED:
+                            kwargs['data'], kwargs['headers'] = self._encode_body(raw,
+                                                                                  compress=False)
+                            compressed = False
+                            probing = True
+                            continue
+                        retryable = self._is_retryable(response.status, idempotent)
+                        if not retryable or attempt >= self.max_retries:
+                            body = await response.read()
+                            if n8n_client._request_hooks:
+                                self._notify(method, path, started, status=response.status,
+                                             retries=attempt,
+                                             bytes_out=len(kwargs.get('data') or b''),
+                                             bytes_in=len(body))
+                            if probing and response.ok:
+                                self._disable_compression()
+                            response.raise_for_status()
+                            return loads(body) if body else None
+                        delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if not idempotent or attempt >= self.max_retries:
+                        self._notify(method, path, started, retries=attempt,
+                                     error=type(e).__name__)
+                        raise
+                    delay = self._retry_delay(attempt)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def list_workflows_page(self, limit=None, cursor=None):
+        """Obtiene una página de workflows ({'data': [...], 'nextCursor': ...})"""
+        params = {'limit': limit or self.page_size}
+        if cursor:
+            params['cursor'] = cursor
+        return await self._request('GET', '/api/v1/workflows', params=params)
+
+    async def iter_workflows(self, page_size=None):
+        """Itera (async for) sobre todos los workflows siguiendo la paginación por cursor"""
+        cursor = None
+        while True:
+            page = await self.list_workflows_page(limit=page_size, cursor=cursor)
+            for workflow in page.get('data', []):
+                yield workflow
+            cursor = page.get('nextCursor')
+            if not cursor:
+                break
+
+    async def list_workflows(self):
+        """Lista todos los workflows (todas las páginas)"""
+        return {'data': [wf async for wf in self.iter_workflows()]}
+
+    async def get_workflow(self, workflow_id):
+        """Obtiene un workflow específico"""
+        return await self._request('GET', f"/api/v1/workflows/{workflow_id}")
+
+    async def create_workflow(self, workflow_data):
+        """Crea un nuevo workflow"""
+        return await self._request('POST', '/api/v1/workflows', json=workflow_data)
+
+    async def update_workflow(self, workflow_id, workflow_data):
+        """Actualiza un workflow existente"""
+        return await self._request('PUT', f"/api/v1/workflows/{workflow_id}", json=workflow_data)
+
+    async def delete_workflow(self, workflow_id):
+        """Elimina un workflow"""
+        await self._request('DELETE', f"/api/v1/workflows/{workflow_id}")
+        return True
+
+    async def activate_workflow(self, workflow_id):
+        """Activa un workflow"""
+        return await self._request('POST', f"/api/v1/workflows/{workflow_id}/activate",
+                                   idempotent=True)
+
+    async def deactivate_workflow(self, workflow_id):
+        """Desactiva un workflow"""
+        return await self._request('POST', f"/api/v1/workflows/{workflow_id}/deactivate",
+                                   idempotent=True)
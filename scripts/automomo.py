@@ -7,6 +7,7 @@ Handles both pull (n8n → Git) and push (Git → n8n) operations
 import sys
 import argparse
 from pathlib import Path
+import instances
 
 def print_header(title: str):
     """Print a formatted header"""
@@ -14,17 +15,132 @@ def print_header(title: str):
     print(f"  {title}")
     print("="*60 + "\n")
 
+def add_engine_argument(parser):
+    """Add the --engine option shared by the commands that talk to n8n"""
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                        help='Motor HTTP: hilos (sync) o asyncio (async, requiere aiohttp)')
+
+def add_instance_arguments(parser, fan_out=True):
+    """--instance (and, for commands that can run on several at once, --all-instances)"""
+    if fan_out:
+        parser.add_argument('--instance', '-I', action='append', metavar='NOMBRE',
+                            help='Instancia de n8n de la configuración; repetible (se ejecutan a la vez)')
+        parser.add_argument('--all-instances', action='store_true',
+                            help='Ejecutar en todas las instancias configuradas a la vez')
+    else:
+        parser.add_argument('--instance', '-I', metavar='NOMBRE',
+                            help='Instancia de n8n de la configuración')
+
+def run_for_instances(args, command) -> bool:
+    """
+    Run command(args) on the selected instances
+    
+    With several instances each one runs concurrently in its own process and
+    an aggregated report is printed; returns False if any of them failed.
+    """
+    if getattr(args, 'shard', None):
+        import functools
+        command = functools.partial(run_shard, command)
+    names = getattr(args, 'instance', None)
+    if getattr(args, 'all_instances', False) or isinstance(names, list):
+        from crypto_helper import CryptoHelper
+        configured = instances.instance_names(CryptoHelper().require_config())
+        if getattr(args, 'all_instances', False):
+            names = configured
+            if not names:
+                raise Exception("No hay instancias en la configuración (sección instances)")
+        unknown = [name for name in names or [] if name not in configured]
+        if unknown:
+            raise Exception(f"Instancia desconocida: {', '.join(unknown)} "
+                            f"(disponibles: {', '.join(configured) or 'ninguna'})")
+        names = list(dict.fromkeys(names or []))
+        if len(names) > 1:
+            results = instances.run_instances(names, command, args)
+            return instances.print_report(f"Resumen de {len(names)} instancias", results)
+        names = names[0] if names else None
+    instances.select(names)
+    command(args)
+    return True
+
+def parse_shard(value):
+    """--shard i/N; shard.py is only imported when the option is given"""
+    from shard import parse_shard
+    return parse_shard(value)
+
+def add_shard_argument(parser):
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help='Procesar solo la parte i de N (reparto estable por nombre de archivo)')
+
+def run_shard(command, args):
+    """Run command and leave its counts, or why it failed, for merge-shards"""
+    from shard import write_summary
+    counts = error = None
+    try:
+        counts = command(args)
+        return counts
+    except BaseException as e:
+        error = str(e) or type(e).__name__
+        raise
+    finally:
+        write_summary(instances.workflows_dir(), args.command, args.shard, counts, error)
+
+def cmd_merge_shards(args):
+    """Combine the workflows, sync state and summaries of several shard runs"""
+    from shard import merge_shards
+    from local_index import LocalIndex
+    
+    print_header("🧩 Combinar shards")
+    target = instances.workflows_dir()
+    results = merge_shards([Path(source) for source in args.sources], target)
+    index = LocalIndex(target)
+    index.refresh()
+    index.save()
+    if not results:
+        print("❌ Ningún directorio contiene resultados de shards")
+        return False
+    return instances.print_report(f"Resumen de {len(results)} shards", results)
+
 def cmd_pull(args):
     """Pull workflows from n8n to Git"""
     from sync_workflows import sync_workflows_to_git
     
     print_header("📥 PULL: n8n → Git")
-    synced, skipped = sync_workflows_to_git()
+    from crypto_helper import CryptoHelper
+    git_config = CryptoHelper().require_config().get('git', {})
+    prefix = git_config.get('commit_message_prefix', '[automomo]')
+    
+    if args.repo:
+        from git_export import export_to_repository
+        if args.shard:
+            raise Exception("--shard no se puede usar con --repo")
+        commit, count = export_to_repository(Path(args.repo), jobs=args.jobs, full=args.full,
+                                             branch=args.branch, message_prefix=prefix)
+        if commit:
+            print(f"\n📝 Commit {commit[:10]} con {count} workflows en {args.repo}")
+        else:
+            print("\n✅ Sin cambios: no se crea ningún commit")
+        return {'en el commit': count}
     
-    if synced > 0:
-        print("\n💡 Tip: Revisa los cambios con 'git diff' y haz commit si es necesario")
+    committer = None
+    if args.commit or git_config.get('auto_commit'):
+        from git_export import worktree_committer
+        committer = worktree_committer(instances.workflows_dir())
     
-    return synced > 0
+    synced, skipped = sync_workflows_to_git(jobs=args.jobs, full=args.full, engine=args.engine,
+                                            committer=committer, shard=args.shard)
+    
+    if committer is not None:
+        count = len(committer.changes)
+        commit = committer.commit(committer.message(prefix))
+        if commit:
+            print(f"\n📝 Commit {commit[:10]} con {count} workflows")
+        else:
+            print("\n✅ Sin cambios respecto al último commit")
+    elif synced > 0:
+        print("\n💡 Tip: Revisa los cambios con 'git diff' y haz commit si es necesario "
+              "(o usa pull --commit)")
+    
+    return {'descargados': synced, 'omitidos': skipped}
 
 def cmd_push(args):
     """Push workflows from Git to n8n"""
@@ -32,33 +148,63 @@ def cmd_push(args):
     
     print_header("📤 PUSH: Git → n8n")
     
-    deployer = WorkflowDeployer()
-    deployer.deploy_all(
+    deployer = WorkflowDeployer(rate_limit=args.rate_limit, pool_size=args.jobs)
+    result = deployer.deploy_all(
         workflow_names=args.workflows if args.workflows else None,
         force=args.force,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        jobs=args.jobs,
+        engine=args.engine,
+        verify_remote=args.verify_remote,
+        offline=args.offline,
+        shard=args.shard,
+        validate=not args.no_validate,
+        transactional=args.transaction
     )
+    deployed, skipped, errors, rolled_back = result or (0, 0, 0, 0)
+    if rolled_back:
+        raise Exception(f"{errors} errores: push deshecho ({rolled_back} workflows restaurados)")
+    if errors:
+        raise Exception(f"{errors} workflows no se pudieron desplegar "
+                        f"({deployed} desplegados, {skipped} sin cambios)")
+    return {'desplegados': deployed, 'sin cambios': skipped, 'errores': errors}
 
 def cmd_status(args):
-    """Show sync status"""
+    """Show sync status
+    
+    Uses one paginated list call plus the local sync state: no workflow is
+    fetched, and only local files whose stat changed since the last run are read.
+    """
     from sync_workflows import name_to_kebab_case
+    from sync_state import SyncState
+    from local_index import LocalIndex
     from n8n_client import N8nClient
-    import json
+    from profiler import profiler
     
     print_header("📊 Estado de Sincronización")
     
     # Get local workflows
-    workflows_dir = Path(__file__).parent.parent / 'workflows'
-    local_files = {f.stem: f for f in workflows_dir.glob('*.json') 
-                   if f.name not in ['.gitkeep', 'README.md']}
+    workflows_dir = instances.workflows_dir()
+    index = LocalIndex(workflows_dir)
+    with profiler.phase('read'):
+        local_files = index.refresh().by_stem()
+    index.save()
+    state = SyncState(workflows_dir)
     
     # Get remote workflows
     client = N8nClient()
-    response = client.list_workflows()
     remote_workflows = {name_to_kebab_case(wf['name']): wf 
-                       for wf in response.get('data', [])
+                       for wf in profiler.timed_iter('list', client.iter_workflows())
                        if not wf.get('isArchived', False)}
     
+    if args.shard:
+        from shard import in_shard
+        local_files = {stem: entry for stem, entry in local_files.items()
+                       if in_shard(stem, args.shard)}
+        remote_workflows = {stem: wf for stem, wf in remote_workflows.items()
+                            if in_shard(stem, args.shard)}
+        print(f"🧩 Shard {args.shard[0]}/{args.shard[1]}")
+    
     print(f"📁 Local:  {len(local_files)} workflows")
     print(f"☁️  Remote: {len(remote_workflows)} workflows (activos)\n")
     
@@ -67,47 +213,234 @@ def cmd_status(args):
     remote_only = set(remote_workflows.keys()) - set(local_files.keys())
     both = set(local_files.keys()) & set(remote_workflows.keys())
     
-    if local_only:
-        print("📦 Solo en Git (listo para push):")
-        for name in sorted(local_only):
-            print(f"   + {name}")
-        print()
+    # Classify shared workflows against the version recorded at the last pull/push
+    in_sync, modified_local, modified_remote, conflicts, untracked = [], [], [], [], []
+    for name in both:
+        remote_wf = remote_workflows[name]
+        entry = state.get(remote_wf['id'])
+        if not entry or entry.get('file') != local_files[name]['file']:
+            untracked.append(name)
+            continue
+        
+        with profiler.phase('compare'):
+            local_changed = local_files[name]['content_hash'] != entry.get('content_hash')
+            remote_changed = state.remote_changed(entry, remote_wf)
+        if local_changed and remote_changed:
+            conflicts.append(name)
+        elif local_changed:
+            modified_local.append(name)
+        elif remote_changed:
+            modified_remote.append(name)
+        else:
+            in_sync.append(name)
     
-    if remote_only:
-        print("☁️  Solo en n8n (listo para pull):")
-        for name in sorted(remote_only):
-            print(f"   + {name}")
-        print()
+    sections = [
+        ("📦 Solo en Git (listo para push):", '+', local_only),
+        ("☁️  Solo en n8n (listo para pull):", '+', remote_only),
+        ("✏️  Modificados en Git (listo para push):", '~', modified_local),
+        ("🔄 Modificados en n8n (listo para pull):", '~', modified_remote),
+        ("⚠️  Conflictos (modificados en Git y en n8n):", '!', conflicts),
+        ("❓ Sin estado de sincronización (ejecuta pull):", '?', untracked),
+    ]
+    # With -v, say what changed in each modified workflow (one fetch per modified workflow)
+    details = {}
+    if args.verbose:
+        sections.append(("✅ Sincronizados:", '=', in_sync))
+        from pipeline import map_bounded
+        
+        def describe(name):
+            try:
+                return name, diff_against_remote(client, local_files[name]['path'],
+                                                 remote_workflows[name]['id']).summary()
+            except Exception as e:
+                return name, f"error: {e}"
+        
+        details = dict(map_bounded(describe, modified_local + modified_remote + conflicts, 8))
+    
+    for title, marker, names in sections:
+        if names:
+            print(title)
+            for name in sorted(names):
+                detail = f"  ({details[name]})" if name in details else ''
+                print(f"   {marker} {name}{detail}")
+            print()
     
-    if not local_only and not remote_only:
+    if len(in_sync) == len(local_files) == len(remote_workflows):
         print("✅ Todo sincronizado!\n")
+    else:
+        print(f"📊 {len(in_sync)} sincronizados, {len(modified_local)} modificados en Git, "
+              f"{len(modified_remote)} modificados en n8n, {len(conflicts)} conflictos\n")
     
-    # Check for modified workflows
-    if args.verbose and both:
-        print("🔍 Verificando cambios en workflows existentes...")
-        modified = []
+    return {'sincronizados': len(in_sync), 'modificados en Git': len(modified_local),
+            'modificados en n8n': len(modified_remote), 'conflictos': len(conflicts)}
+
+def diff_against_remote(client, local_path, workflow_id):
+    """WorkflowDiff from the workflow in n8n to the local file (what a push would change)"""
+    from json_io import loads
+    from sync_workflows import clean_workflow
+    from workflow_diff import WorkflowDiff
+    
+    remote = clean_workflow(client.get_workflow(workflow_id))
+    local = loads(local_path.read_bytes())
+    return WorkflowDiff(remote, local)
+
+def cmd_validate(args):
+    """Check the local workflow files offline; True if none has errors"""
+    from validate import count_issues, print_issues, validate_directory
+    
+    print_header("🔎 Validar workflows locales")
+    results = validate_directory(instances.workflows_dir(), args.workflows or None,
+                                 jobs=args.jobs)
+    if not results:
+        print("❌ No se encontraron workflows locales")
+        return False
+    print_issues(results)
+    errors, warnings = count_issues(results)
+    valid = sum(1 for issues in results.values()
+                if not any(item['level'] == 'error' for item in issues))
+    print(f"\n📊 Resumen: {valid}/{len(results)} válidos, {errors} errores, {warnings} avisos")
+    return errors == 0 and not (args.strict and warnings)
+
+def cmd_rollback(args):
+    """Undo a transactional push, or list the pushes that can be undone"""
+    from transaction import (COMMITTED, OPEN, ROLLED_BACK, find_journal, list_journals,
+                             mark_journal, rollback)
+    
+    workflows_dir = instances.workflows_dir()
+    if not args.push_id:
+        print_header("🧾 Pushes transaccionales")
+        journals = list_journals(workflows_dir)
+        if not journals:
+            print("No hay pushes registrados (usa push --transaction)")
+            return True
+        icons = {COMMITTED: '✅', ROLLED_BACK: '↩️ ', OPEN: '⚠️ '}
+        for journal in journals:
+            count = len(journal['updates']) + len(journal['created'])
+            print(f"{icons.get(journal['status'], '  ')} {journal['push']}  {journal['time']}  "
+                  f"{count} workflows  ({journal['status']})")
+        print("\n💡 Deshaz uno con: ./automomo rollback <push-id>")
+        return True
+    
+    from n8n_client import N8nClient
+    from sync_state import SyncState
+    
+    print_header(f"↩️  Rollback del push {args.push_id}")
+    journal = find_journal(workflows_dir, args.push_id)
+    if journal['status'] == ROLLED_BACK and not args.force:
+        print("⏭️  Este push ya se deshizo (usa --force para repetirlo)")
+        return True
+    client = N8nClient(pool_size=args.jobs)
+    state = SyncState(workflows_dir)
+    try:
+        restored, skipped, errors = rollback(journal, client, jobs=args.jobs, force=args.force,
+                                             state=state)
+    finally:
+        state.save()
+    if not errors:
+        mark_journal(workflows_dir, args.push_id, ROLLED_BACK)
+    print(f"\n📊 Resumen: {restored} restaurados, {skipped} omitidos, {errors} errores")
+    if restored:
+        print("\n💡 Tip: Los archivos locales no cambian y aparecen como modificados en Git; "
+              "usa pull --full para traer las versiones restauradas")
+    return errors == 0
+
+def cmd_diff(args):
+    """Show node-level differences between local workflows and n8n"""
+    from sync_workflows import name_to_kebab_case
+    from sync_state import SyncState
+    from local_index import LocalIndex
+    from n8n_client import N8nClient
+    
+    print_header("🔍 Diferencias n8n → Git")
+    
+    workflows_dir = instances.workflows_dir()
+    index = LocalIndex(workflows_dir)
+    by_stem = index.refresh().by_stem()
+    index.save()
+    by_name = {entry['name']: entry for entry in by_stem.values() if entry['name']}
+    state = SyncState(workflows_dir)
+    client = N8nClient()
+    
+    found_all = True
+    for target in args.workflows:
+        # Accept a workflow name, a file name/path or its kebab-case stem
+        entry = (by_name.get(target) or by_stem.get(Path(target).stem) or
+                 by_stem.get(name_to_kebab_case(target)))
+        if not entry:
+            print(f"❌ No existe el workflow local: {target}\n")
+            found_all = False
+            continue
+        
+        workflow_id = entry['id'] or next((wf_id for wf_id, recorded in state.workflows.items()
+                                           if recorded.get('file') == entry['file']), None)
+        title = entry['name'] or entry['stem']
+        if not workflow_id:
+            print(f"📦 {title}: solo en Git (sin ID en n8n)\n")
+            continue
         
-        for name in both:
-            local_file = local_files[name]
-            remote_wf = remote_workflows[name]
-            
-            with open(local_file, 'r') as f:
-                local_data = json.load(f)
-            
-            remote_full = client.get_workflow(remote_wf['id'])
-            
-            # Simple comparison (could be more sophisticated)
-            local_nodes = json.dumps(local_data.get('nodes', []), sort_keys=True)
-            remote_nodes = json.dumps(remote_full.get('nodes', []), sort_keys=True)
-            
-            if local_nodes != remote_nodes:
-                modified.append(name)
+        try:
+            diff = diff_against_remote(client, entry['path'], workflow_id)
+        except Exception as e:
+            print(f"❌ {title}: {e}\n")
+            found_all = False
+            continue
         
-        if modified:
-            print(f"\n🔄 Workflows con cambios detectados ({len(modified)}):")
-            for name in modified:
-                print(f"   ~ {name}")
+        if diff.is_empty:
+            print(f"✅ {title}: sin cambios\n")
+            continue
+        print(f"✏️  {title} ({diff.summary()})")
+        for line in diff.lines():
+            print(f"   {line}")
         print()
+    return found_all
+
+def cmd_lifecycle(args):
+    """Activate, deactivate or delete every workflow matching the selectors"""
+    from lifecycle import LifecycleRunner, confirm
+    
+    titles = {'activate': "▶️  Activar workflows", 'deactivate': "⏸️  Desactivar workflows",
+              'delete': "🗑️  Eliminar workflows"}
+    print_header(titles[args.command])
+    
+    selectors = {'names': args.name, 'tags': args.tag, 'node_types': args.node_type, 'ids': args.id}
+    if not any(selectors.values()) and not args.all:
+        print("❌ Indica qué workflows con --name, --tag, --node-type o --id (o --all para todos)")
+        return False
+    
+    runner = LifecycleRunner(rate_limit=args.rate_limit, jobs=args.jobs)
+    workflows = runner.select(**selectors)
+    if not workflows:
+        print("⚠️  Ningún workflow coincide con los criterios")
+        return True
+    print(f"🎯 {len(workflows)} workflows seleccionados\n")
+    
+    if args.command == 'delete' and not args.dry_run and not args.yes:
+        if not confirm('Eliminar', workflows):
+            print("⏭️  Operación cancelada")
+            return False
+    
+    done, skipped, errors = runner.run(args.command, workflows, dry_run=args.dry_run)
+    return errors == 0
+
+def add_selector_arguments(parser, action_help):
+    """Selectors and options shared by activate, deactivate and delete"""
+    parser.add_argument('--name', '-N', action='append', metavar='GLOB',
+                        help='Nombre del workflow o patrón (p. ej. "gmail*"); repetible')
+    parser.add_argument('--tag', '-t', action='append', metavar='TAG',
+                        help='Workflows con esta etiqueta; repetible')
+    parser.add_argument('--node-type', action='append', metavar='GLOB',
+                        help='Workflows con algún nodo de este tipo (p. ej. "*gmailTrigger"); repetible')
+    parser.add_argument('--id', action='append', metavar='ID',
+                        help='ID de workflow; repetible')
+    parser.add_argument('--all', action='store_true',
+                        help=f'{action_help} todos los workflows (si no se da ningún criterio)')
+    parser.add_argument('--jobs', '-j', type=int, default=8,
+                        help='Workflows procesados en paralelo (por defecto 8)')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='Máximo de peticiones por segundo a n8n (sobrescribe n8n.rate_limit)')
+    parser.add_argument('--dry-run', '-n', action='store_true',
+                        help='Mostrar los workflows afectados sin hacer cambios')
+    add_instance_arguments(parser, fan_out=False)
 
 def cmd_sync(args):
     """Full bidirectional sync"""
@@ -116,38 +449,90 @@ def cmd_sync(args):
     # First pull from n8n
     print("Paso 1/2: Descargando cambios de n8n...\n")
     from sync_workflows import sync_workflows_to_git
-    synced, skipped = sync_workflows_to_git()
+    synced, skipped = sync_workflows_to_git(jobs=args.jobs, full=args.full, engine=args.engine)
+    deployed = errors = 0
     
     if not args.no_push:
         print("\n\nPaso 2/2: Subiendo cambios a n8n...\n")
         from deploy_to_n8n import WorkflowDeployer
-        deployer = WorkflowDeployer()
-        deployer.deploy_all(force=args.force, dry_run=args.dry_run)
+        deployer = WorkflowDeployer(rate_limit=args.rate_limit, pool_size=args.jobs)
+        result = deployer.deploy_all(force=args.force, dry_run=args.dry_run, jobs=args.jobs,
+                                     engine=args.engine, verify_remote=args.verify_remote)
+        deployed, _, errors, _ = result or (0, 0, 0, 0)
     else:
         print("\n⏭️  Push omitido (--no-push)")
     
     print_header("✅ Sincronización Completa")
+    return {'descargados': synced, 'desplegados': deployed, 'errores': errors}
+
+def cmd_watch(args):
+    """Sync continuously until interrupted"""
+    import signal
+    from watch import watch
+    
+    print_header("👀 WATCH: n8n ↔ Git")
+    # Stop cleanly (saving the sync state) when run as a service
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    watch(interval=args.interval, max_interval=args.max_interval, push=not args.no_push)
 
 def main():
+    from pipeline import DEFAULT_JOBS
+    
     parser = argparse.ArgumentParser(
         description='Bidirectional sync for n8n workflows',
         epilog="""
 Ejemplos:
   %(prog)s pull                    # Descargar workflows de n8n
+  %(prog)s pull -j 16              # Descargar con 16 peticiones en paralelo
+  %(prog)s pull --commit           # Descargar y crear un commit con lo que cambió
+  %(prog)s pull --repo backup.git  # Commit directo en un repositorio bare de backup
   %(prog)s push                    # Subir workflows a n8n
   %(prog)s push workflow1 workflow2  # Subir workflows específicos
   %(prog)s push --dry-run          # Ver qué se subiría sin hacer cambios
+  %(prog)s push -n --offline       # Igual, usando solo el estado local (sin red)
   %(prog)s status                  # Ver estado de sincronización
-  %(prog)s status -v               # Ver estado con detalles de cambios
+  %(prog)s status -v               # Ver estado con el detalle de cada cambio
+  %(prog)s diff "n8n - error trigger"  # Nodos y conexiones que cambian entre n8n y Git
+  %(prog)s validate                # Comprobar los workflows locales sin conexión
+  %(prog)s push --transaction      # Si algo falla, se deshace todo el push
+  %(prog)s rollback                # Listar los pushes que se pueden deshacer
   %(prog)s sync                    # Sincronización completa (pull + push)
+  %(prog)s pull --all-instances    # Descargar de todas las instancias a la vez
+  %(prog)s status -I staging       # Estado de una instancia concreta
+  %(prog)s pull --shard 2/4        # Descargar solo la parte 2 de 4 (CI en paralelo)
+  %(prog)s merge-shards shard-*/workflows  # Combinar los resultados de los shards
+  %(prog)s watch                   # Sincronizar continuamente (pull + push de lo que cambie)
+  %(prog)s deactivate -t ventas    # Pausar todos los workflows con la etiqueta "ventas"
+  %(prog)s activate -N "gmail*"    # Reanudar los workflows cuyo nombre empieza por "gmail"
+  %(prog)s --profile pull          # Descargar y mostrar métricas por endpoint y fase
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
+    parser.add_argument('--profile', action='store_true',
+                        help='Mostrar al final latencias por endpoint (p50/p95/p99), bytes, reintentos y tiempo por fase')
+    parser.add_argument('--profile-json', metavar='PATH', default=None,
+                        help='Guardar las métricas del perfil en un archivo JSON')
+    parser.add_argument('--profile-prom', metavar='PATH', default=None,
+                        help='Guardar las métricas en formato textfile de Prometheus (node_exporter)')
+    
     subparsers = parser.add_subparsers(dest='command', help='Comando a ejecutar')
     
     # Pull command
     parser_pull = subparsers.add_parser('pull', help='Descargar workflows de n8n a Git')
+    parser_pull.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                            help=f'Workflows descargados en paralelo (por defecto {DEFAULT_JOBS})')
+    parser_pull.add_argument('--full', action='store_true',
+                            help='Descargar todos los workflows aunque no hayan cambiado')
+    add_engine_argument(parser_pull)
+    parser_pull.add_argument('--commit', action='store_true',
+                            help='Crear un commit con los workflows que cambiaron (o git.auto_commit)')
+    parser_pull.add_argument('--repo', metavar='PATH', default=None,
+                            help='Hacer el commit en este repositorio bare, sin escribir en workflows/')
+    parser_pull.add_argument('--branch', default=None,
+                            help='Rama del commit con --repo (por defecto la de HEAD)')
+    add_instance_arguments(parser_pull)
+    add_shard_argument(parser_pull)
     
     # Push command
     parser_push = subparsers.add_parser('push', help='Subir workflows de Git a n8n')
@@ -157,11 +542,62 @@ Ejemplos:
                             help='Forzar actualización aunque no haya cambios')
     parser_push.add_argument('--dry-run', '-n', action='store_true',
                             help='Mostrar lo que se haría sin hacer cambios')
+    parser_push.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                            help=f'Workflows desplegados en paralelo (por defecto {DEFAULT_JOBS})')
+    parser_push.add_argument('--rate-limit', type=float, default=None,
+                            help='Máximo de peticiones por segundo a n8n (sobrescribe n8n.rate_limit)')
+    add_engine_argument(parser_push)
+    parser_push.add_argument('--verify-remote', action='store_true',
+                            help='Comparar con cada workflow remoto en vez de usar los hashes guardados')
+    parser_push.add_argument('--offline', action='store_true',
+                            help='Con --dry-run, comparar con el estado guardado sin conectar con n8n')
+    parser_push.add_argument('--no-validate', action='store_true',
+                            help='No validar los archivos locales antes de subirlos')
+    parser_push.add_argument('--transaction', action='store_true',
+                            help='Guardar la versión anterior de cada workflow y deshacerlo todo si algo falla')
+    add_instance_arguments(parser_push)
+    add_shard_argument(parser_push)
     
     # Status command
     parser_status = subparsers.add_parser('status', help='Ver estado de sincronización')
     parser_status.add_argument('--verbose', '-v', action='store_true',
-                              help='Mostrar detalles de cambios')
+                              help='Listar también los sincronizados y resumir los cambios de cada workflow')
+    add_instance_arguments(parser_status)
+    add_shard_argument(parser_status)
+    
+    # Merge shards command
+    parser_merge = subparsers.add_parser('merge-shards',
+                                         help='Combinar los resultados de varias ejecuciones con --shard')
+    parser_merge.add_argument('sources', nargs='+', metavar='DIR',
+                              help='Directorio de workflows de cada shard')
+    add_instance_arguments(parser_merge, fan_out=False)
+    
+    # Rollback command
+    parser_rollback = subparsers.add_parser('rollback',
+                                            help='Deshacer un push hecho con --transaction')
+    parser_rollback.add_argument('push_id', nargs='?',
+                                 help='Push a deshacer (sin él, lista los disponibles)')
+    parser_rollback.add_argument('--force', '-f', action='store_true',
+                                 help='Restaurar también los workflows editados en n8n después del push')
+    parser_rollback.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                                 help=f'Workflows restaurados en paralelo (por defecto {DEFAULT_JOBS})')
+    add_instance_arguments(parser_rollback, fan_out=False)
+    
+    parser_validate = subparsers.add_parser('validate',
+                                            help='Comprobar los workflows locales sin conexión')
+    parser_validate.add_argument('workflows', nargs='*',
+                                 help='Nombres o archivos a validar (todos si no se especifica)')
+    parser_validate.add_argument('--jobs', '-j', type=int, default=None,
+                                 help='Procesos en paralelo (por defecto, uno por núcleo)')
+    parser_validate.add_argument('--strict', action='store_true',
+                                 help='Terminar con error también si hay avisos')
+    add_instance_arguments(parser_validate, fan_out=False)
+    
+    # Diff command
+    parser_diff = subparsers.add_parser('diff', help='Ver qué nodos y conexiones cambian entre n8n y Git')
+    parser_diff.add_argument('workflows', nargs='+',
+                            help='Nombre del workflow, archivo o nombre en kebab-case')
+    add_instance_arguments(parser_diff, fan_out=False)
     
     # Sync command
     parser_sync = subparsers.add_parser('sync', help='Sincronización bidireccional completa')
@@ -171,6 +607,36 @@ Ejemplos:
                             help='Modo de prueba sin hacer cambios')
     parser_sync.add_argument('--no-push', action='store_true',
                             help='Solo hacer pull, no push')
+    parser_sync.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                            help=f'Workflows descargados/desplegados en paralelo (por defecto {DEFAULT_JOBS})')
+    parser_sync.add_argument('--rate-limit', type=float, default=None,
+                            help='Máximo de peticiones por segundo a n8n (sobrescribe n8n.rate_limit)')
+    parser_sync.add_argument('--full', action='store_true',
+                            help='Descargar todos los workflows aunque no hayan cambiado')
+    add_engine_argument(parser_sync)
+    parser_sync.add_argument('--verify-remote', action='store_true',
+                            help='Comparar con cada workflow remoto en vez de usar los hashes guardados')
+    add_instance_arguments(parser_sync)
+    
+    # Watch command
+    parser_watch = subparsers.add_parser('watch', help='Sincronizar continuamente n8n y Git')
+    parser_watch.add_argument('--interval', type=float, default=None,
+                             help='Segundos entre consultas a n8n tras un cambio (por defecto 5)')
+    parser_watch.add_argument('--max-interval', type=float, default=None,
+                             help='Máximo de segundos entre consultas sin cambios (por defecto 120)')
+    parser_watch.add_argument('--no-push', action='store_true',
+                             help='Solo descargar cambios de n8n, no subir los locales')
+    add_instance_arguments(parser_watch, fan_out=False)
+    
+    # Lifecycle commands
+    parser_activate = subparsers.add_parser('activate', help='Activar workflows en n8n')
+    add_selector_arguments(parser_activate, 'Activar')
+    parser_deactivate = subparsers.add_parser('deactivate', help='Desactivar workflows en n8n')
+    add_selector_arguments(parser_deactivate, 'Desactivar')
+    parser_delete = subparsers.add_parser('delete', help='Eliminar workflows de n8n')
+    add_selector_arguments(parser_delete, 'Eliminar')
+    parser_delete.add_argument('--yes', '-y', action='store_true',
+                              help='No pedir confirmación')
     
     args = parser.parse_args()
     
@@ -178,15 +644,36 @@ Ejemplos:
         parser.print_help()
         sys.exit(1)
     
+    profiling = args.profile or args.profile_json or args.profile_prom
+    if profiling:
+        from profiler import profiler
+        profiler.enable(args.command)
+    
     try:
-        if args.command == 'pull':
-            cmd_pull(args)
-        elif args.command == 'push':
-            cmd_push(args)
-        elif args.command == 'status':
-            cmd_status(args)
-        elif args.command == 'sync':
-            cmd_sync(args)
+        fan_out_commands = {'pull': cmd_pull, 'push': cmd_push, 'status': cmd_status,
+                            'sync': cmd_sync}
+        if args.command in fan_out_commands:
+            if not run_for_instances(args, fan_out_commands[args.command]):
+                sys.exit(1)
+            return
+        instances.select(getattr(args, 'instance', None))
+        if args.command == 'watch':
+            cmd_watch(args)
+        elif args.command == 'diff':
+            if not cmd_diff(args):
+                sys.exit(1)
+        elif args.command == 'validate':
+            if not cmd_validate(args):
+                sys.exit(1)
+        elif args.command == 'rollback':
+            if not cmd_rollback(args):
+                sys.exit(1)
+        elif args.command == 'merge-shards':
+            if not cmd_merge_shards(args):
+                sys.exit(1)
+        elif args.command in ('activate', 'deactivate', 'delete'):
+            if not cmd_lifecycle(args):
+                sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n⚠️  Operación cancelada por el usuario")
         sys.exit(1)
@@ -195,6 +682,23 @@ Ejemplos:
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if profiling:
+            report_profile(args)
+
+def report_profile(args):
+    """Print and/or save the metrics collected with --profile"""
+    from profiler import profiler
+    
+    profiler.stop()
+    if args.profile:
+        profiler.print_report()
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+        print(f"💾 Perfil guardado en {args.profile_json}")
+    if args.profile_prom:
+        profiler.write_prometheus(args.profile_prom)
+        print(f"💾 Métricas Prometheus guardadas en {args.profile_prom}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark de pull/push/status/sync contra el mock local de n8n
+Para cada tamaño arranca mock_n8n_server con workflows sintéticos, ejecuta
+automomo en un directorio temporal aislado y mide tiempo, peticiones, bytes
+transferidos y pico de memoria (RSS) de cada comando
+"""
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mock_n8n_server import MockN8nServer, synthetic_workflows
+from sync_state import iter_workflow_files
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+
+# (etiqueta, argumentos de automomo); el orden importa: cada paso parte del estado del anterior
+STEPS = [
+    ('pull', ['pull']),
+    ('pull (incremental)', ['pull']),
+    ('status -v', ['status', '-v']),
+    ('push', ['push']),
+    ('sync', ['sync']),
+]
+
+def make_sandbox(url, api_key):
+    """Copia de scripts/ con su propia config y workflows/ vacío"""
+    sandbox = Path(tempfile.mkdtemp(prefix='automomo-bench-'))
+    scripts_dir = Path(__file__).parent
+    (sandbox / 'scripts').mkdir()
+    for script in scripts_dir.glob('*.py'):
+        shutil.copy2(script, sandbox / 'scripts' / script.name)
+    (sandbox / 'config').mkdir()
+    with open(sandbox / 'config' / 'config.json', 'w') as f:
+        json.dump({'n8n': {'url': url, 'api_key': api_key}}, f)
+    (sandbox / 'workflows').mkdir()
+    return sandbox
+
+def touch_workflows(workflows_dir, ratio):
+    """Modifica una fracción de los workflows locales para que push tenga trabajo"""
+    files = sorted(iter_workflow_files(workflows_dir))
+    count = int(len(files) * ratio)
+    for file_path in files[:count]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            workflow = json.load(f)
+        if workflow.get('nodes'):
+            workflow['nodes'][0]['notes'] = f"benchmark {time.time()}"
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(workflow, f, indent=2, ensure_ascii=False)
+    return count
+
+# El pico de RSS de un hijo incluye la memoria de quien lo lanza (el kernel lo
+# hereda en fork/exec), y este proceso tiene en memoria todos los workflows del
+# mock. Un intérprete mínimo intermedio lanza automomo y devuelve su rusage.
+RSS_RUNNER = """
+import os, subprocess, sys
+process = subprocess.Popen(sys.argv[2:])
+_, status, usage = os.wait4(process.pid, 0)
+with open(sys.argv[1], 'w') as f:
+    f.write(str(usage.ru_maxrss))
+sys.exit(os.waitstatus_to_exitcode(status))
+"""
+
+def run_step(sandbox, args):
+    """Ejecuta automomo en un proceso hijo; devuelve (segundos, pico RSS en KB, código de salida)"""
+    rss_file = sandbox / '.maxrss'
+    command = [sys.executable, '-c', RSS_RUNNER, str(rss_file),
+               sys.executable, str(sandbox / 'scripts' / 'automomo.py')] + args
+    with tempfile.TemporaryFile() as output:
+        start = time.perf_counter()
+        returncode = subprocess.call(command, cwd=sandbox, stdout=output, stderr=subprocess.STDOUT)
+        elapsed = time.perf_counter() - start
+        if returncode != 0:
+            output.seek(0)
+            log = output.read().decode('utf-8', 'replace')
+            print(f"⚠️  {' '.join(args)} terminó con código {returncode}\n{log[-2000:]}")
+    # ru_maxrss está en KB en Linux
+    max_rss_kb = int(rss_file.read_text()) if rss_file.exists() else 0
+    return elapsed, max_rss_kb, returncode
+
+def benchmark_size(size, args):
+    """Ejecuta todos los pasos con `size` workflows; devuelve una fila por paso"""
+    server = MockN8nServer(synthetic_workflows(size, nodes=args.nodes),
+                           latency=args.latency, error_rate=args.error_rate).start()
+    sandbox = make_sandbox(server.url, server.api_key)
+    rows = []
+    try:
+        for label, step_args in STEPS:
+            if args.commands and step_args[0] not in args.commands:
+                continue
+            if step_args[0] in ('pull', 'push', 'sync'):
+                step_args = step_args + ['--jobs', str(args.jobs)]
+            if step_args[0] == 'push':
+                touch_workflows(sandbox / 'workflows', args.touch_ratio)
+
+            server.reset_stats()
+            elapsed, max_rss_kb, returncode = run_step(sandbox, step_args)
+            stats = server.snapshot_stats()
+            rows.append({
+                'workflows': size,
+                'command': label,
+                'wall_s': round(elapsed, 3),
+                'requests': stats['requests'],
+                'bytes_sent': stats['bytes_in'],
+                'bytes_received': stats['bytes_out'],
+                'peak_rss_mb': round(max_rss_kb / 1024, 1),
+                'returncode': returncode,
+            })
+            print_row(rows[-1])
+    finally:
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(sandbox, ignore_errors=True)
+        else:
+            print(f"📁 Sandbox conservado en {sandbox}")
+    return rows
+
+def print_row(row):
+    print(f"{row['workflows']:>7} {row['command']:<20} {row['wall_s']:>9.3f} "
+          f"{row['requests']:>9} {row['bytes_sent'] / 1e6:>10.2f} "
+          f"{row['bytes_received'] / 1e6:>10.2f} {row['peak_rss_mb']:>10.1f}")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de automomo contra un mock local de n8n')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Números de workflows separados por comas')
+    parser.add_argument('--commands', nargs='*', choices=['pull', 'push', 'status', 'sync'],
+                        help='Comandos a medir (todos si no se especifica)')
+    parser.add_argument('--nodes', type=int, default=None,
+                        help='Nodos por workflow sintético (por defecto los de la plantilla)')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='Latencia del mock por petición, en segundos')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fracción de peticiones que el mock responde con 503')
+    parser.add_argument('--jobs', '-j', type=int, default=4,
+                        help='--jobs para pull/push/sync')
+    parser.add_argument('--touch-ratio', type=float, default=0.1,
+                        help='Fracción de workflows modificados localmente antes de push')
+    parser.add_argument('--json', dest='json_path', default=None,
+                        help='Guardar los resultados en este archivo JSON')
+    parser.add_argument('--keep', action='store_true',
+                        help='No borrar los directorios temporales')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    print(f"{'wfs':>7} {'command':<20} {'wall s':>9} {'requests':>9} "
+          f"{'MB sent':>10} {'MB recv':>10} {'RSS MB':>10}")
+    results = []
+    for size in sizes:
+        results.extend(benchmark_size(size, args))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.json_path}")
+
+    if any(row['returncode'] != 0 for row in results):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
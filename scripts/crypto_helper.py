@@ -3,11 +3,32 @@
 Helper para encriptar/desencriptar configuración sensible
 """
 import os
+import copy
 import json
 import base64
-from cryptography.fernet import Fernet
+import hashlib
+import time
 from pathlib import Path
 
+# Segundos que dura la copia desencriptada en $XDG_RUNTIME_DIR (0 = desactivada)
+CONFIG_CACHE_TTL_ENV = 'AUTOMOMO_CONFIG_CACHE_TTL'
+
+# Configuración ya leída en este proceso: ruta del archivo -> (firma, config)
+_config_cache = {}
+
+def fernet_class():
+    """Importa Fernet solo cuando hace falta (cryptography tarda en cargar)"""
+    from cryptography.fernet import Fernet
+    return Fernet
+
+def file_signature(path):
+    """(mtime_ns, tamaño) de un archivo, o None si no existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
 class CryptoHelper:
     def __init__(self, key_file=None):
         self.base_dir = Path(__file__).parent.parent
@@ -17,7 +38,7 @@ class CryptoHelper:
         
     def generate_key(self):
         """Genera una nueva clave de encriptación"""
-        key = Fernet.generate_key()
+        key = fernet_class().generate_key()
         with open(self.key_file, 'wb') as f:
             f.write(key)
         os.chmod(self.key_file, 0o600)  # Solo lectura/escritura para el propietario
@@ -45,11 +66,12 @@ class CryptoHelper:
             config_data = f.read()
         
         key = self.get_key()
-        fernet = Fernet(key)
+        fernet = fernet_class()(key)
         encrypted_data = fernet.encrypt(config_data.encode())
         
         with open(self.encrypted_file, 'wb') as f:
             f.write(encrypted_data)
+        self.invalidate()
         
         print(f"✅ Configuración encriptada en: {self.encrypted_file}")
         return True
@@ -61,7 +83,7 @@ class CryptoHelper:
             return None
         
         key = self.get_key()
-        fernet = Fernet(key)
+        fernet = fernet_class()(key)
         
         with open(self.encrypted_file, 'rb') as f:
             encrypted_data = f.read()
@@ -73,8 +95,44 @@ class CryptoHelper:
             print(f"❌ Error al desencriptar: {e}")
             return None
     
+    def signature(self):
+        """Identifica la versión de los archivos de configuración y clave"""
+        return [file_signature(self.encrypted_file), file_signature(self.key_file),
+                file_signature(self.config_file)]
+    
     def get_config(self):
-        """Obtiene la configuración (encriptada o sin encriptar)"""
+        """
+        Obtiene la configuración (encriptada o sin encriptar)
+        
+        Se memoriza por proceso mientras no cambien el mtime/tamaño de los
+        archivos, y si AUTOMOMO_CONFIG_CACHE_TTL está definido también se
+        guarda desencriptada durante ese tiempo en $XDG_RUNTIME_DIR
+        """
+        signature = self.signature()
+        cache_key = str(self.encrypted_file)
+        cached = _config_cache.get(cache_key)
+        if cached and cached[0] == signature:
+            return copy.deepcopy(cached[1])
+        
+        config = self.read_runtime_cache(signature)
+        if config is None:
+            config = self._load_config()
+            if config is not None and self.encrypted_file.exists():
+                self.write_runtime_cache(signature, config)
+        
+        if config is not None:
+            _config_cache[cache_key] = (signature, config)
+            return copy.deepcopy(config)
+        return None
+    
+    def require_config(self):
+        """get_config(), con error si no hay configuración"""
+        config = self.get_config()
+        if not config:
+            raise Exception("No se pudo cargar la configuración")
+        return config
+    
+    def _load_config(self):
         # Primero intenta leer el archivo encriptado
         if self.encrypted_file.exists():
             return self.decrypt_config()
@@ -87,13 +145,75 @@ class CryptoHelper:
         print("❌ No se encontró ningún archivo de configuración")
         print("💡 Copia config.example.json a config.json y configúralo")
         return None
+    
+    def invalidate(self):
+        """Olvida la configuración memorizada (en este proceso y en $XDG_RUNTIME_DIR)"""
+        _config_cache.pop(str(self.encrypted_file), None)
+        cache_file = self.runtime_cache_file()
+        if cache_file:
+            try:
+                cache_file.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def runtime_cache_ttl(self):
+        try:
+            return float(os.environ.get(CONFIG_CACHE_TTL_ENV) or 0)
+        except ValueError:
+            return 0
+    
+    def runtime_cache_file(self):
+        """
+        Archivo de la copia desencriptada, o None si no hay $XDG_RUNTIME_DIR
+        (un tmpfs propio del usuario; nunca se usa /tmp)
+        """
+        runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+        if not runtime_dir:
+            return None
+        name = hashlib.sha256(str(self.encrypted_file.resolve()).encode()).hexdigest()[:16]
+        return Path(runtime_dir) / 'automomo' / f"config-{name}.json"
+    
+    def read_runtime_cache(self, signature):
+        """Config de la copia desencriptada si sigue vigente y es segura, si no None"""
+        cache_file = self.runtime_cache_file()
+        if not cache_file or self.runtime_cache_ttl() <= 0:
+            return None
+        try:
+            stat = cache_file.stat()
+            # Solo se confía en un archivo propio y no legible por otros
+            if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+                return None
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('signature') != signature or data.get('expires', 0) < time.time():
+            return None
+        return data.get('config')
+    
+    def write_runtime_cache(self, signature, config):
+        """Guarda la config desencriptada (0600) hasta que caduque el TTL"""
+        cache_file = self.runtime_cache_file()
+        ttl = self.runtime_cache_ttl()
+        if not cache_file or ttl <= 0:
+            return
+        data = {'signature': signature, 'expires': time.time() + ttl, 'config': config}
+        try:
+            cache_file.parent.mkdir(mode=0o700, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar la caché de configuración: {e}")
 
 def main():
     import sys
     crypto = CryptoHelper()
     
     if len(sys.argv) < 2:
-        print("Uso: python crypto_helper.py [encrypt|decrypt|generate-key|show]")
+        print("Uso: python crypto_helper.py [encrypt|decrypt|generate-key|show|clear-cache]")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -110,9 +230,13 @@ def main():
         config = crypto.get_config()
         if config:
             # Ocultar el API key en la salida
-            if 'n8n' in config and 'api_key' in config['n8n']:
-                config['n8n']['api_key'] = "***HIDDEN***"
+            for section in [config.get('n8n')] + list((config.get('instances') or {}).values()):
+                if section and 'api_key' in section:
+                    section['api_key'] = "***HIDDEN***"
             print(json.dumps(config, indent=2))
+    elif command == "clear-cache":
+        crypto.invalidate()
+        print("✅ Caché de configuración eliminada")
     else:
         print(f"❌ Comando desconocido: {command}")
         sys.exit(1)
@@ -4,148 +4,341 @@ Deploy workflows from Git to n8n
 Supports creating new workflows or updating existing ones
 """
 
-import json
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional
-from n8n_client import N8nClient
+from typing import Dict, Iterator, List, Optional, Tuple
+import instances
+from json_io import loads
+from local_index import LocalIndex
+from pipeline import amap_bounded, map_bounded
+from profiler import profiler
+from shard import in_shard
+from sync_state import SyncState, summarize
+from sync_workflows import clean_workflow
+from workflow_content import (build_deploy_data, has_changes, minimize_deploy_data,
+                              static_data_hash, workflow_hash)
 
 class WorkflowDeployer:
-    def __init__(self):
-        self.client = N8nClient()
-        self.workflows_dir = Path(__file__).parent.parent / 'workflows'
+    def __init__(self, rate_limit: Optional[float] = None, pool_size: Optional[int] = None,
+                 client=None, state: Optional[SyncState] = None):
+        self.rate_limit = rate_limit
+        self.pool_size = pool_size
+        # A long-running caller (watch) shares its client and in-memory state
+        self._client = client
+        self.workflows_dir = instances.workflows_dir()
+        self.state = state or SyncState(self.workflows_dir)
+        # transaction.PushJournal of a transactional push in progress
+        self.journal = None
+    
+    @property
+    def client(self):
+        """N8nClient created on first use, so offline runs never load the config"""
+        if self._client is None:
+            from n8n_client import N8nClient
+            self._client = N8nClient(rate_limit=self.rate_limit, pool_size=self.pool_size)
+        return self._client
         
     def get_local_workflows(self) -> List[Dict]:
         """Get all workflow files from local repository"""
-        workflows = []
-        for file_path in self.workflows_dir.glob('*.json'):
-            if file_path.name in ['.gitkeep', 'README.md']:
-                continue
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    workflow = json.load(f)
-                    workflow['_file_path'] = file_path
-                    workflows.append(workflow)
-            except Exception as e:
-                print(f"⚠️  Error leyendo {file_path.name}: {e}")
+        return list(self.iter_local_workflows())
+    
+    def get_local_entries(self, workflow_names: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Local workflow files as LocalIndex entries (name, id, content hash)
+        
+        Costs one stat() per file; only files changed since the last run are parsed.
+        """
+        index = LocalIndex(self.workflows_dir)
+        with profiler.phase('read'):
+            entries = list(index.refresh().entries())
+        index.save()
+        if workflow_names:
+            entries = [entry for entry in entries
+                       if (entry['name'] or 'unnamed') in workflow_names]
+        return entries
+    
+    def read_local_workflow(self, file_path: Path) -> Optional[Dict]:
+        """Parse one local workflow file (None if it can't be read)"""
+        try:
+            with profiler.phase('read'):
+                workflow = loads(file_path.read_bytes())
+        except Exception as e:
+            print(f"⚠️  Error leyendo {file_path.name}: {e}")
+            return None
+        workflow['_file_path'] = file_path
+        return workflow
+    
+    def iter_local_workflows(self, workflow_names: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Read local workflow files one at a time (optionally only the given names)"""
+        for entry in self.get_local_entries(workflow_names):
+            workflow = self.read_local_workflow(entry['path'])
+            if workflow is not None:
+                yield workflow
+    
+    def iter_pending_workflows(self, entries: List[Dict], remote_workflows: Dict[str, Dict],
+                               options: Dict, count) -> Iterator[Dict]:
+        """
+        Read the local workflows that may need deploying
         
-        return workflows
+        Files whose indexed content hash matches the version n8n still holds
+        are counted as unchanged without even being parsed.
+        """
+        for entry in entries:
+            if self.journal is not None and self.journal.failed:
+                # A transactional push stops at the first failure
+                return
+            existing = remote_workflows.get(entry['name'])
+            if (existing and entry['valid'] and not options['force'] and
+                    not options['verify_remote'] and
+                    self.is_unchanged(existing, entry['content_hash'])):
+                print(f"⏭️  Sin cambios: {entry['name']}")
+                count(False)
+                continue
+            workflow = self.read_local_workflow(entry['path'])
+            if workflow is not None:
+                yield workflow
     
     def get_remote_workflows(self) -> Dict[str, Dict]:
-        """Get all workflows from n8n, indexed by name"""
-        response = self.client.list_workflows()
-        workflows = response.get('data', [])
-        return {wf['name']: wf for wf in workflows}
+        """Get all workflows from n8n, indexed by name (only the fields deploys need)"""
+        with profiler.phase('list'):
+            return {wf['name']: summarize(wf) for wf in self.client.iter_workflows()}
     
-    def deploy_workflow(self, local_workflow: Dict, remote_workflows: Dict[str, Dict], 
-                       force: bool = False, dry_run: bool = False) -> bool:
-        """Deploy a single workflow to n8n"""
+    def get_cached_remote_workflows(self) -> Dict[str, Dict]:
+        """The remote workflows as recorded in the sync state at the last pull/push"""
+        return {entry['name']: {'id': workflow_id, 'name': entry['name'],
+                                'versionId': entry.get('versionId'),
+                                'updatedAt': entry.get('updatedAt')}
+                for workflow_id, entry in self.state.workflows.items()}
+    
+    def validate_local(self, local_entries: List[Dict], present: Optional[List[Dict]] = None):
+        """Pre-flight: refuse to push if a local file has validation errors (see validate.py)"""
+        from validate import count_issues, print_issues, validate_entries
+        
+        with profiler.phase('validate'):
+            results = validate_entries(self.workflows_dir, local_entries, present=present)
+        errors, warnings = count_issues(results)
+        if errors:
+            print_issues(results, warnings=False)
+            print()
+            raise Exception(f"{errors} errores de validación: corrígelos o usa --no-validate")
+        if warnings:
+            print(f"⚠️  {warnings} avisos de validación (revísalos con ./automomo validate)\n")
+    
+    def is_unchanged(self, existing: Dict, local_hash: str) -> bool:
+        """True if neither the local content nor the remote version changed since the last sync"""
+        return self.state.is_deployed(existing, local_hash)
+    
+    def record_unchanged(self, local_workflow: Dict, remote_full: Dict, local_hash: str):
+        """Remember a remote version found equal to the local file, so the next push skips the fetch"""
+        if workflow_hash(clean_workflow(remote_full)) == local_hash:
+            self.state.record_deployed(remote_full, local_workflow['_file_path'], local_hash,
+                                       static_data_hash(local_workflow))
+    
+    def record_deployed(self, local_workflow: Dict, result: Dict, local_hash: str):
+        """Remember the version n8n created for the content just pushed"""
+        if result.get('id'):
+            self.state.record_deployed(result, local_workflow['_file_path'], local_hash,
+                                       static_data_hash(local_workflow))
+    
+    def update_data(self, deploy_data: Dict, existing: Dict,
+                    remote_full: Optional[Dict] = None) -> Dict:
+        """
+        Body for updating an existing workflow
+        
+        staticData is dropped when it matches what n8n holds: the version
+        recorded at the last pull/push or, if it was fetched, the remote one.
+        """
+        known = set()
+        entry = self.state.get(existing['id'])
+        if entry and entry.get('static_hash'):
+            known.add(entry['static_hash'])
+        if remote_full is not None:
+            known.add(static_data_hash(remote_full))
+        return minimize_deploy_data(deploy_data, known)
+    
+    def deploy_steps(self, local_workflow: Dict, remote_workflows: Dict[str, Dict],
+                     force: bool = False, dry_run: bool = False,
+                     verify_remote: bool = False, offline: bool = False):
+        """
+        Decide and report the deploy of one workflow, without doing any I/O
+        
+        A generator shared by the sync and async paths: it yields the client
+        calls to make as (method name, *args), is sent back their results
+        (or has their exceptions thrown into it) and returns the outcome and
+        its message (see deploy_workflow).
+        """
         workflow_name = local_workflow.get('name', 'unnamed')
-        file_path = local_workflow.get('_file_path')
-        
-        # Only include fields that n8n accepts in updates
-        # name, nodes, connections, settings are the core fields
-        # staticData can be included if not None, but causes issues sometimes
-        allowed_fields = ['name', 'nodes', 'connections', 'settings']
-        deploy_data = {k: v for k, v in local_workflow.items() 
-                      if k in allowed_fields}
-        
-        # Filter settings to only include allowed fields
-        # Only executionOrder is allowed, other fields are read-only
-        if 'settings' in deploy_data and deploy_data['settings']:
-            allowed_settings = ['executionOrder']
-            deploy_data['settings'] = {k: v for k, v in deploy_data['settings'].items() 
-                                       if k in allowed_settings}
-        
-        # Add staticData only if it exists and is not None
-        if local_workflow.get('staticData') is not None:
-            deploy_data['staticData'] = local_workflow['staticData']
+        with profiler.phase('hash'):
+            deploy_data = build_deploy_data(local_workflow)
+            local_hash = workflow_hash(local_workflow)
         
         # Check if workflow exists in n8n
         existing = remote_workflows.get(workflow_name)
         
         if existing:
             workflow_id = existing['id']
+            remote_full = None
             
             # Check if there are changes (skip if force=True)
             if not force:
-                remote_full = self.client.get_workflow(workflow_id)
+                if not verify_remote and self.is_unchanged(existing, local_hash):
+                    return False, f"⏭️  Sin cambios: {workflow_name}"
                 
-                # Compare key fields (ignore metadata like updatedAt, versionId, etc.)
-                local_nodes = json.dumps(deploy_data.get('nodes', []), sort_keys=True)
-                remote_nodes = json.dumps(remote_full.get('nodes', []), sort_keys=True)
-                local_connections = json.dumps(deploy_data.get('connections', {}), sort_keys=True)
-                remote_connections = json.dumps(remote_full.get('connections', {}), sort_keys=True)
-                
-                if local_nodes == remote_nodes and local_connections == remote_connections:
-                    print(f"⏭️  Sin cambios: {workflow_name}")
-                    return False
+                if not offline:
+                    with profiler.phase('fetch'):
+                        remote_full = yield 'get_workflow', workflow_id
+                    
+                    with profiler.phase('compare'):
+                        changed = has_changes(deploy_data, remote_full)
+                    if not changed:
+                        self.record_unchanged(local_workflow, remote_full, local_hash)
+                        return False, f"⏭️  Sin cambios: {workflow_name}"
             
             if dry_run:
-                print(f"🔄 [DRY-RUN] Actualizaría: {workflow_name} (ID: {workflow_id})")
-                return True
+                return True, f"🔄 [DRY-RUN] Actualizaría: {workflow_name} (ID: {workflow_id})"
             
             # Update existing workflow
             try:
+                # In a transactional push the overwritten fields are journaled first
+                if self.journal is not None and remote_full is None:
+                    with profiler.phase('fetch'):
+                        remote_full = yield 'get_workflow', workflow_id
                 # Don't send ID in the body, it's in the URL
-                self.client.update_workflow(workflow_id, deploy_data)
-                print(f"✅ Actualizado: {workflow_name} (ID: {workflow_id})")
-                return True
+                update_data = self.update_data(deploy_data, existing, remote_full)
+                if self.journal is not None:
+                    self.journal.snapshot(remote_full, update_data)
+                with profiler.phase('deploy'):
+                    result = yield 'update_workflow', workflow_id, update_data
+                if self.journal is not None:
+                    self.journal.updated(workflow_id, result)
+                self.record_deployed(local_workflow, result, local_hash)
+                return True, f"✅ Actualizado: {workflow_name} (ID: {workflow_id})"
             except Exception as e:
-                print(f"❌ Error actualizando {workflow_name}: {e}")
                 import traceback
-                traceback.print_exc()
-                return False
+                return None, (f"❌ Error actualizando {workflow_name}: {e}\n"
+                              f"{traceback.format_exc().rstrip()}")
         else:
             if dry_run:
-                print(f"✨ [DRY-RUN] Crearía nuevo: {workflow_name}")
-                return True
+                return True, f"✨ [DRY-RUN] Crearía nuevo: {workflow_name}"
             
             # Create new workflow
             try:
-                # Remove id if present (n8n will assign new one)
-                deploy_data.pop('id', None)
-                result = self.client.create_workflow(deploy_data)
+                with profiler.phase('deploy'):
+                    result = yield 'create_workflow', deploy_data
+                if self.journal is not None:
+                    self.journal.created(result)
+                self.record_deployed(local_workflow, result, local_hash)
                 new_id = result.get('id', 'unknown')
-                print(f"✨ Creado: {workflow_name} (ID: {new_id})")
-                return True
+                return True, f"✨ Creado: {workflow_name} (ID: {new_id})"
             except Exception as e:
-                print(f"❌ Error creando {workflow_name}: {e}")
-                return False
+                return None, f"❌ Error creando {workflow_name}: {e}"
+    
+    def deploy_workflow(self, local_workflow: Dict, remote_workflows: Dict[str, Dict], 
+                       force: bool = False, dry_run: bool = False,
+                       verify_remote: bool = False,
+                       offline: bool = False) -> Tuple[Optional[bool], str]:
+        """Deploy a single workflow to n8n
+        
+        Unchanged workflows are detected from the content hash in the sync
+        state, with no API call; verify_remote (or a stale state) falls back to
+        fetching the remote workflow and comparing it. offline (dry-run only)
+        trusts the hashes alone and never calls the API.
+        
+        Returns (result, message): result is True if deployed, False if
+        unchanged and None on error. The message is printed by the caller,
+        so concurrent deploys never write to the terminal at once.
+        """
+        steps = self.deploy_steps(local_workflow, remote_workflows, force=force,
+                                  dry_run=dry_run, verify_remote=verify_remote, offline=offline)
+        try:
+            call = next(steps)
+            while True:
+                method, *args = call
+                try:
+                    response = getattr(self.client, method)(*args)
+                except Exception as e:
+                    call = steps.throw(e)
+                else:
+                    call = steps.send(response)
+        except StopIteration as done:
+            return done.value
+    
+    async def deploy_workflow_async(self, client, local_workflow: Dict,
+                                    remote_workflows: Dict[str, Dict],
+                                    force: bool = False, dry_run: bool = False,
+                                    verify_remote: bool = False) -> Tuple[Optional[bool], str]:
+        """Same as deploy_workflow, using an AsyncN8nClient"""
+        steps = self.deploy_steps(local_workflow, remote_workflows, force=force,
+                                  dry_run=dry_run, verify_remote=verify_remote)
+        try:
+            call = next(steps)
+            while True:
+                method, *args = call
+                try:
+                    response = await getattr(client, method)(*args)
+                except Exception as e:
+                    call = steps.throw(e)
+                else:
+                    call = steps.send(response)
+        except StopIteration as done:
+            return done.value
     
     def deploy_all(self, workflow_names: Optional[List[str]] = None, 
-                   force: bool = False, dry_run: bool = False):
-        """Deploy all workflows or specific ones"""
+                   force: bool = False, dry_run: bool = False, jobs: int = 1,
+                   engine: str = 'sync', verify_remote: bool = False,
+                   offline: bool = False, shard=None, validate: bool = True,
+                   transactional: bool = False):
+        """Deploy all workflows or specific ones
+        
+        With jobs > 1 workflows are deployed concurrently; the client's rate
+        limiter keeps the total request rate against n8n bounded.
+        engine='async' runs every deploy on one event loop (AsyncN8nClient),
+        jobs being the number of requests in flight.
+        verify_remote fetches every remote workflow to compare instead of
+        trusting the content hashes recorded in the sync state.
+        offline (only with dry_run) takes the remote list from the sync state
+        instead of n8n: no config is decrypted and no request is made.
+        shard=(i, N) only deploys the local files of that shard (see shard.py).
+        validate checks the files offline first and deploys nothing if any
+        has errors.
+        transactional journals the remote version of every workflow before
+        changing it (see transaction.py); if any deploy fails, nothing else is
+        deployed and the changes already made are rolled back.
+        
+        Returns (deployed, skipped, errors, rolled_back): workflows deployed
+        and then rolled back are only counted in rolled_back.
+        """
+        if offline and not dry_run:
+            raise Exception("--offline solo se puede usar con --dry-run")
+        if offline and verify_remote:
+            raise Exception("--offline y --verify-remote son incompatibles")
         
         print("🔄 Obteniendo workflows locales...")
-        local_workflows = self.get_local_workflows()
+        local_entries = self.get_local_entries()
         
-        if not local_workflows:
+        if not local_entries:
             print("❌ No se encontraron workflows locales")
             return
         
-        print(f"📦 Encontrados {len(local_workflows)} workflows locales\n")
-        
-        print("🔍 Obteniendo workflows de n8n...")
-        remote_workflows = self.get_remote_workflows()
-        print(f"📡 Encontrados {len(remote_workflows)} workflows en n8n\n")
+        print(f"📦 Encontrados {len(local_entries)} workflows locales\n")
+        present = local_entries
         
-        if dry_run:
-            print("🧪 MODO DRY-RUN: No se realizarán cambios\n")
+        # Filter by workflow names if specified
+        if workflow_names:
+            local_entries = [entry for entry in local_entries
+                             if (entry['name'] or 'unnamed') in workflow_names]
+        if shard:
+            local_entries = [entry for entry in local_entries if in_shard(entry['stem'], shard)]
+            print(f"🧩 Shard {shard[0]}/{shard[1]}: {len(local_entries)} workflows\n")
+        if validate:
+            self.validate_local(local_entries, present)
         
         deployed = 0
         skipped = 0
         errors = 0
         
-        for workflow in local_workflows:
-            workflow_name = workflow.get('name', 'unnamed')
-            
-            # Filter by workflow names if specified
-            if workflow_names and workflow_name not in workflow_names:
-                continue
-            
-            success = self.deploy_workflow(workflow, remote_workflows, force, dry_run)
+        def count(success):
+            nonlocal deployed, skipped, errors
             if success:
                 deployed += 1
             elif success is False:
@@ -153,7 +346,132 @@ class WorkflowDeployer:
             else:
                 errors += 1
         
-        print(f"\n📊 Resumen: {deployed} desplegados, {skipped} sin cambios, {errors} errores")
+        options = {'force': force, 'dry_run': dry_run, 'verify_remote': verify_remote}
+        if transactional and not dry_run:
+            from transaction import PushJournal
+            if engine == 'async':
+                print("ℹ️  El push transaccional usa el motor sync")
+                engine = 'sync'
+            self.journal = PushJournal(self.workflows_dir, instances.current())
+        if offline:
+            print("📂 Usando el estado de la última sincronización (sin conexión)...")
+            options['offline'] = True
+            engine = 'sync'
+        else:
+            print("🔍 Obteniendo workflows de n8n...")
+        try:
+            if engine == 'async':
+                import asyncio
+                sent = asyncio.run(self._deploy_all_async(local_entries, options, jobs, count))
+            else:
+                sent = self._deploy_all_threaded(local_entries, options, jobs, count)
+        except BaseException:
+            if self.journal is not None:
+                journal, self.journal = self.journal, None
+                journal.release()
+                print(f"\n⚠️  Push {journal.push_id} interrumpido; "
+                      f"deshazlo con ./automomo rollback {journal.push_id}")
+            raise
+        finally:
+            self.state.save()
+        
+        rolled_back = 0
+        if self.journal is not None:
+            rolled_back = self.finish_transaction(jobs)
+            deployed -= rolled_back
+        print(f"\n📊 Resumen: {deployed} desplegados, {skipped} sin cambios, {errors} errores"
+              + (f", {rolled_back} deshechos" if rolled_back else ""))
+        if sent and sent['requests']:
+            print(f"📤 Enviado: {sent['bytes'] / 1024:.1f} KB en {sent['requests']} peticiones "
+                  f"({sent['raw_bytes'] / 1024:.1f} KB sin comprimir)")
+        return deployed, skipped, errors, rolled_back
+    
+    def finish_transaction(self, jobs: int) -> int:
+        """
+        Commit the journal, or roll back what the push changed if a deploy
+        failed; returns the number of workflows rolled back
+        """
+        from transaction import COMMITTED, OPEN, ROLLED_BACK, read_journal, rollback
+        
+        journal, self.journal = self.journal, None
+        if not journal.failed:
+            journal.close(COMMITTED)
+            print(f"\n🧾 Push {journal.push_id} "
+                  f"(deshazlo con ./automomo rollback {journal.push_id})")
+            return 0
+        print(f"\n↩️  El push falló: deshaciendo los cambios de {journal.push_id}...\n")
+        with profiler.phase('rollback'):
+            try:
+                restored, _, failed = rollback(read_journal(journal.path), self.client,
+                                               jobs=max(jobs, 1), force=True, state=self.state)
+            finally:
+                self.state.save()
+        journal.close(OPEN if failed else ROLLED_BACK)
+        print(f"\n↩️  Rollback: {restored} workflows restaurados, {failed} errores")
+        if failed:
+            print(f"   Reinténtalo con ./automomo rollback {journal.push_id}")
+        return restored
+    
+    def _deploy_all_threaded(self, local_entries, options, jobs, count):
+        """Deploy with a thread pool; returns the request bodies sent (see N8nClientBase.sent)"""
+        sent_before = None
+        if options.get('offline'):
+            remote_workflows = self.get_cached_remote_workflows()
+        else:
+            sent_before = dict(self.client.sent)
+            remote_workflows = self.get_remote_workflows()
+        print(f"📡 Encontrados {len(remote_workflows)} workflows en n8n\n")
+        
+        if options['dry_run']:
+            print("🧪 MODO DRY-RUN: No se realizarán cambios\n")
+        
+        def deploy(workflow):
+            try:
+                result, message = self.deploy_workflow(workflow, remote_workflows, **options)
+            except Exception as e:
+                result = None
+                message = f"❌ Error desplegando {workflow.get('name', 'unnamed')}: {e}"
+            if result is None and self.journal is not None:
+                self.journal.failed = True
+            return result, message
+        
+        # Files are read as deploy slots free up, so only a bounded number of
+        # workflows is in memory at once. Results are printed and counted here,
+        # in the main thread, so no locking is needed
+        local_workflows = self.iter_pending_workflows(local_entries, remote_workflows,
+                                                      options, count)
+        for result, message in map_bounded(deploy, local_workflows, jobs):
+            print(message)
+            count(result)
+        if sent_before is not None:
+            return {key: value - sent_before[key] for key, value in self.client.sent.items()}
+    
+    async def _deploy_all_async(self, local_entries, options, jobs, count):
+        from async_n8n_client import AsyncN8nClient
+        
+        async with AsyncN8nClient(rate_limit=self.rate_limit, concurrency=jobs) as client:
+            with profiler.phase('list'):
+                remote_workflows = {wf['name']: summarize(wf)
+                                    async for wf in client.iter_workflows()}
+            print(f"📡 Encontrados {len(remote_workflows)} workflows en n8n\n")
+            
+            if options['dry_run']:
+                print("🧪 MODO DRY-RUN: No se realizarán cambios\n")
+            
+            async def deploy(workflow):
+                try:
+                    return await self.deploy_workflow_async(client, workflow, remote_workflows,
+                                                            **options)
+                except Exception as e:
+                    return None, f"❌ Error desplegando {workflow.get('name', 'unnamed')}: {e}"
+            
+            # Single event loop: printing and counting need no locking either
+            local_workflows = self.iter_pending_workflows(local_entries, remote_workflows,
+                                                          options, count)
+            async for result, message in amap_bounded(deploy, local_workflows, 2 * jobs):
+                print(message)
+                count(result)
+            return client.sent
 
 def main():
     import argparse
@@ -164,16 +482,38 @@ def main():
                        help='Force update even if no changes detected')
     parser.add_argument('--dry-run', '-n', action='store_true',
                        help='Show what would be deployed without making changes')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Number of workflows deployed in parallel')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                       help='Max API requests per second (overrides n8n.rate_limit)')
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                       help='HTTP engine: thread pool (sync) or asyncio (async, needs aiohttp)')
+    parser.add_argument('--verify-remote', action='store_true',
+                       help='Fetch and compare every remote workflow instead of trusting cached hashes')
+    parser.add_argument('--offline', action='store_true',
+                       help='With --dry-run, compare against the sync state without contacting n8n')
+    parser.add_argument('--no-validate', action='store_true',
+                       help='Skip the offline validation of the local files')
+    parser.add_argument('--transaction', action='store_true',
+                       help='Roll back every change if any workflow fails to deploy')
     
     args = parser.parse_args()
     
     try:
-        deployer = WorkflowDeployer()
-        deployer.deploy_all(
+        deployer = WorkflowDeployer(rate_limit=args.rate_limit, pool_size=args.jobs)
+        result = deployer.deploy_all(
             workflow_names=args.workflows if args.workflows else None,
             force=args.force,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            jobs=args.jobs,
+            engine=args.engine,
+            verify_remote=args.verify_remote,
+            offline=args.offline,
+            validate=not args.no_validate,
+            transactional=args.transaction
         )
+        if result and result[2]:
+            sys.exit(1)
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
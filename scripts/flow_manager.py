@@ -6,13 +6,24 @@ import json
 import sys
 from pathlib import Path
 from datetime import datetime
-from n8n_client import N8nClient
+from json_io import dumps_workflow
+from local_index import LocalIndex
+from safe_write import BatchWriter, write_atomic
+from sync_state import iter_workflow_files
 
 class FlowManager:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
         self.flows_dir = self.base_dir / "flows"
-        self.client = N8nClient()
+        self._client = None
+    
+    @property
+    def client(self):
+        """Cliente de n8n, creado al usarlo por primera vez (list no lo necesita)"""
+        if self._client is None:
+            from n8n_client import N8nClient
+            self._client = N8nClient()
+        return self._client
     
     def sanitize_filename(self, name):
         """Convierte el nombre del workflow en un nombre de archivo válido"""
@@ -26,10 +37,11 @@ class FlowManager:
         """Descarga todos los workflows de n8n a archivos locales"""
         print("🔄 Descargando workflows desde n8n...")
         
-        workflows = self.client.list_workflows()
         count = 0
+        self.flows_dir.mkdir(exist_ok=True)
+        writer = BatchWriter(self.flows_dir)
         
-        for wf in workflows.get('data', []):
+        for wf in self.client.iter_workflows():
             workflow_id = wf['id']
             workflow_name = wf['name']
             
@@ -38,16 +50,16 @@ class FlowManager:
             
             # Crear nombre de archivo
             filename = self.sanitize_filename(workflow_name) + ".json"
-            filepath = self.flows_dir / filename
             
-            # Guardar
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(full_workflow, f, indent=2, ensure_ascii=False)
+            # Guardar (atómico, y solo si el contenido cambió)
+            changed = writer.write(filename, dumps_workflow(full_workflow))
             
             status = "✅" if wf.get('active') else "⭕"
-            print(f"  {status} {workflow_name} → {filename}")
+            suffix = "" if changed else " (sin cambios)"
+            print(f"  {status} {workflow_name} → {filename}{suffix}")
             count += 1
         
+        writer.sync()
         print(f"\n✅ {count} workflows descargados a {self.flows_dir}")
     
     def push_all(self):
@@ -58,7 +70,7 @@ class FlowManager:
             print(f"❌ No existe el directorio {self.flows_dir}")
             return
         
-        json_files = list(self.flows_dir.glob("*.json"))
+        json_files = list(iter_workflow_files(self.flows_dir))
         
         if not json_files:
             print(f"⚠️  No hay archivos JSON en {self.flows_dir}")
@@ -83,52 +95,46 @@ class FlowManager:
                     
                     # Actualizar el archivo con el nuevo ID
                     workflow_data['id'] = result['id']
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        json.dump(workflow_data, f, indent=2, ensure_ascii=False)
+                    write_atomic(filepath, dumps_workflow(workflow_data))
             
             except Exception as e:
                 print(f"  ❌ Error con {workflow_name}: {e}")
         
         print(f"\n✅ Sincronización completada")
     
+    def local_entries(self):
+        """Archivos de flows/ con su id y nombre (solo se leen los que cambiaron)"""
+        index = LocalIndex(self.flows_dir)
+        entries = list(index.refresh().entries())
+        index.save()
+        return entries
+    
     def list_local(self):
         """Lista los workflows locales"""
         print(f"\n📁 Workflows locales en {self.flows_dir}:\n")
         
-        json_files = list(self.flows_dir.glob("*.json"))
+        entries = self.local_entries()
         
-        if not json_files:
+        if not entries:
             print("  (vacío)")
             return
         
-        for filepath in json_files:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                workflow_data = json.load(f)
-            
-            workflow_id = workflow_data.get('id', 'sin-id')
-            workflow_name = workflow_data.get('name', filepath.stem)
+        for entry in entries:
+            workflow_id = entry['id'] or 'sin-id'
+            workflow_name = entry['name'] or entry['stem']
             
             print(f"  [{workflow_id}] {workflow_name}")
-            print(f"    └─ {filepath.name}")
+            print(f"    └─ {entry['file']}")
     
     def compare(self):
         """Compara workflows locales vs remotos"""
         print("🔍 Comparando workflows locales vs n8n...\n")
         
         # Obtener workflows remotos
-        remote_workflows = self.client.list_workflows()
-        remote_dict = {wf['id']: wf for wf in remote_workflows.get('data', [])}
-        
-        # Obtener workflows locales
-        local_files = list(self.flows_dir.glob("*.json"))
-        local_dict = {}
+        remote_dict = {wf['id']: wf for wf in self.client.iter_workflows()}
         
-        for filepath in local_files:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                workflow_data = json.load(f)
-            wf_id = workflow_data.get('id')
-            if wf_id:
-                local_dict[wf_id] = {'data': workflow_data, 'file': filepath}
+        # Obtener workflows locales (id y nombre desde el índice, sin parsear cada archivo)
+        local_dict = {entry['id']: entry for entry in self.local_entries() if entry['id']}
         
         # Solo en n8n (no descargados)
         only_remote = set(remote_dict.keys()) - set(local_dict.keys())
@@ -143,7 +149,7 @@ class FlowManager:
         if only_local:
             print("💾 Solo en local (no subidos a n8n):")
             for wf_id in only_local:
-                print(f"  - {local_dict[wf_id]['data']['name']}")
+                print(f"  - {local_dict[wf_id]['name']}")
             print()
         
         # En ambos
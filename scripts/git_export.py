@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Commit pulled workflows straight into a git repository
+Blobs for the changed files only are streamed to one `git fast-import`
+process, which writes them, the tree and the commit into the object database:
+no `git add -A` over the whole directory, and in a bare backup repository no
+working tree at all
+"""
+
+import hashlib
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+EXPORT_STATE_FILENAME = 'automomo-export.json'
+
+def blob_sha(data: bytes) -> str:
+    """Object id git gives to a blob with this content"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+def git(repo: Path, *args, input: Optional[bytes] = None, check: bool = True) -> bytes:
+    result = subprocess.run(['git', '-C', str(repo), *args], input=input,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if check and result.returncode != 0:
+        raise Exception(f"git {args[0]}: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+class GitCommitter:
+    """
+    Collects changed workflow files and commits them on top of a branch
+
+    add() keeps only the files whose blob differs from the one the branch
+    already has; commit() writes everything with a single fast-import.
+    """
+
+    def __init__(self, repo: Path, branch: Optional[str] = None, prefix: str = 'workflows/'):
+        self.repo = Path(repo)
+        self.prefix = prefix
+        self.bare = git(self.repo, 'rev-parse', '--is-bare-repository').strip() == b'true'
+        head = git(self.repo, 'symbolic-ref', '-q', 'HEAD', check=False).strip().decode()
+        self.ref = f'refs/heads/{branch}' if branch else (head or 'refs/heads/main')
+        # Only the checked out branch has a working tree (and an index) to keep in step
+        self.checked_out = not self.bare and self.ref == head
+
+        parent = git(self.repo, 'rev-parse', '--verify', '-q', f'{self.ref}^{{commit}}',
+                     check=False).strip().decode()
+        self.parent = parent or None
+        # Path -> blob id of the files the branch has under prefix
+        self.tree: Dict[str, str] = {}
+        if self.parent:
+            listing = git(self.repo, 'ls-tree', '-r', '-z', self.parent, '--', prefix)
+            for record in listing.split(b'\0'):
+                if record:
+                    info, path = record.split(b'\t', 1)
+                    self.tree[path.decode('utf-8')] = info.split()[2].decode()
+        self.changes: Dict[str, bytes] = {}
+
+    def add(self, filename: str, data: bytes) -> bool:
+        """Stage a file for the commit if it differs from the branch; True if it does"""
+        path = self.prefix + filename
+        if self.tree.get(path) == blob_sha(data):
+            self.changes.pop(path, None)
+            return False
+        self.changes[path] = data
+        return True
+
+    def committer_ident(self) -> str:
+        """'Name <email> timestamp tz' from git's config, or a generic automomo identity"""
+        ident = git(self.repo, 'var', 'GIT_COMMITTER_IDENT', check=False).strip().decode()
+        return ident or f"automomo <automomo@localhost> {int(time.time())} +0000"
+
+    def message(self, prefix: str = '[automomo]') -> str:
+        added = sorted(path for path in self.changes if path not in self.tree)
+        modified = sorted(path for path in self.changes if path in self.tree)
+        parts = []
+        if added:
+            parts.append(f"{len(added)} nuevos")
+        if modified:
+            parts.append(f"{len(modified)} modificados")
+        lines = [f"{prefix} Pull de n8n: {', '.join(parts)}", '']
+        lines.extend(f"A {path}" for path in added)
+        lines.extend(f"M {path}" for path in modified)
+        return '\n'.join(lines) + '\n'
+
+    def commit(self, message: Optional[str] = None) -> Optional[str]:
+        """Create the commit and move the branch; returns its id (None if nothing changed)"""
+        if not self.changes:
+            return None
+        message = (message or self.message()).encode('utf-8')
+        stream = [f"commit {self.ref}\n".encode(),
+                  f"committer {self.committer_ident()}\n".encode('utf-8'),
+                  b'data %d\n' % len(message), message]
+        if self.parent:
+            stream.append(f"from {self.parent}\n".encode())
+        for path in sorted(self.changes):
+            data = self.changes[path]
+            stream.append(f"M 100644 inline {path}\n".encode('utf-8'))
+            stream.append(b'data %d\n' % len(data))
+            stream.append(data)
+            stream.append(b'\n')
+        # fast-import refuses to move the branch if it no longer points at parent
+        git(self.repo, 'fast-import', '--quiet', '--date-format=raw', input=b''.join(stream))
+        commit = git(self.repo, 'rev-parse', self.ref).strip().decode()
+
+        if self.checked_out:
+            # The files are already in the working tree; point the index at
+            # the new blobs so `git status` stays clean for them
+            index_info = ''.join(f"100644 {blob_sha(data)}\t{path}\n"
+                                 for path, data in self.changes.items())
+            git(self.repo, 'update-index', '--index-info', input=index_info.encode('utf-8'))
+        self.tree.update({path: blob_sha(data) for path, data in self.changes.items()})
+        self.parent = commit
+        self.changes = {}
+        return commit
+
+def worktree_committer(workflows_dir: Path) -> GitCommitter:
+    """Committer for the repository that contains workflows/ (the files go under their path in it)"""
+    top = git(workflows_dir, 'rev-parse', '--show-toplevel').strip().decode()
+    prefix = git(workflows_dir, 'rev-parse', '--show-prefix').strip().decode()
+    return GitCommitter(Path(top), prefix=prefix)
+
+def export_to_repository(repo: Path, jobs: int = 4, full: bool = False,
+                         branch: Optional[str] = None, message_prefix: str = '[automomo]'):
+    """
+    Pull into a bare repository: one commit with the workflows that changed
+
+    Nothing is written outside the repository. The versionId/updatedAt
+    exported for each workflow are kept in the repository's
+    automomo-export.json, so only workflows that changed in n8n are fetched.
+    Returns (commit id or None, number of files committed).
+    """
+    import json
+    from json_io import dumps_workflow, loads
+    from n8n_client import N8nClient
+    from normalize import Normalizer, configured_rules
+    from pipeline import map_bounded
+    from profiler import profiler
+    from safe_write import write_if_changed
+    from sync_state import summarize
+    from sync_workflows import (clean_workflow, collision_warning, file_owners,
+                                name_to_kebab_case)
+
+    committer = GitCommitter(repo, branch)
+    if not committer.bare:
+        raise Exception(f"{repo} no es un repositorio bare (usa pull --commit sin --repo)")
+    git_dir = Path(git(repo, 'rev-parse', '--absolute-git-dir').strip().decode())
+    state_path = git_dir / EXPORT_STATE_FILENAME
+    try:
+        exported = loads(state_path.read_bytes())
+    except (OSError, ValueError):
+        exported = {}
+
+    client = N8nClient(pool_size=jobs)
+    normalizer = Normalizer(configured_rules(client.config))
+
+    def wanted(workflow, filename):
+        entry = exported.get(workflow['id'])
+        return (full or not entry or entry.get('file') != filename or
+                committer.prefix + filename not in committer.tree or
+                entry.get('versionId') != workflow.get('versionId') or
+                entry.get('updatedAt') != workflow.get('updatedAt'))
+
+    def fetch(workflow):
+        with profiler.phase('fetch'):
+            full_workflow = client.get_workflow(workflow['id'])
+        with profiler.phase('clean'):
+            full_workflow = clean_workflow(full_workflow, normalizer)
+        with profiler.phase('serialize'):
+            return workflow, dumps_workflow(full_workflow)
+
+    print(f"🔄 Fetching workflows from n8n into {repo}...")
+    pending = {}
+    listed = [summarize(wf) for wf in profiler.timed_iter('list', client.iter_workflows())]
+    owners, left_out = file_owners((wf for wf in listed if not wf.get('isArchived', False)),
+                                   exported)
+    for workflow, filename in left_out:
+        print(collision_warning(workflow, filename, owners[filename]))
+    changed_workflows = [workflow for filename, workflow in owners.items()
+                         if wanted(workflow, filename)]
+    for workflow, data in map_bounded(fetch, changed_workflows, jobs):
+        filename = name_to_kebab_case(workflow.get('name', 'unnamed')) + '.json'
+        if committer.add(filename, data):
+            print(f"✅ {workflow.get('name')} → {committer.prefix}{filename}")
+        pending[workflow['id']] = {'file': filename, 'versionId': workflow.get('versionId'),
+                                   'updatedAt': workflow.get('updatedAt')}
+
+    count = len(committer.changes)
+    commit = committer.commit(committer.message(message_prefix))
+    # Recorded only once the commit exists, so a failed run is retried in full
+    listed_ids = {workflow['id'] for workflow in listed}
+    exported = {workflow_id: entry for workflow_id, entry in exported.items()
+                if workflow_id in listed_ids}
+    exported.update(pending)
+    write_if_changed(state_path, json.dumps(exported, indent=2, sort_keys=True).encode('utf-8'))
+    return commit, count
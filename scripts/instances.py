@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Varias instancias de n8n (staging, prod, clientes...) en una misma configuración
+
+    "instances": {
+        "staging": {"url": "...", "api_key": "...", "rate_limit": 5},
+        "prod": {"url": "...", "api_key": "...", "workflows_dir": "workflows-prod"}
+    }
+
+Cada instancia hereda las opciones de la sección n8n y guarda sus workflows
+en workflows/<nombre>/ (o en su workflows_dir). Con --all-instances cada una
+se ejecuta en su propio proceso, con su pool de conexiones, su limitador y su
+estado, y la salida de cada línea va prefijada con el nombre de la instancia
+"""
+
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Instancia seleccionada en este proceso (None: la sección n8n de siempre)
+_current: Optional[str] = None
+
+def select(name: Optional[str]):
+    global _current
+    _current = name
+
+def current() -> Optional[str]:
+    return _current
+
+def instance_names(config: Dict) -> List[str]:
+    return sorted(config.get('instances') or {})
+
+def n8n_settings(config: Dict, name: Optional[str] = None) -> Dict:
+    """Opciones de conexión de una instancia: las de n8n más las suyas"""
+    name = name or _current
+    settings = dict(config.get('n8n') or {})
+    if name is None:
+        if 'url' not in settings:
+            names = ', '.join(instance_names(config))
+            raise Exception(f"No hay n8n.url en la configuración: usa --instance ({names}) "
+                            f"o --all-instances")
+        return settings
+    instances = config.get('instances') or {}
+    if name not in instances:
+        raise Exception(f"Instancia desconocida: {name} "
+                        f"(disponibles: {', '.join(instance_names(config)) or 'ninguna'})")
+    settings.update({key: value for key, value in instances[name].items()
+                     if key != 'workflows_dir'})
+    return settings
+
+def workflows_dir(name: Optional[str] = None) -> Path:
+    """Directorio de workflows de la instancia (workflows/ sin instancia)"""
+    name = name or _current
+    if name is None:
+        return BASE_DIR / 'workflows'
+    from crypto_helper import CryptoHelper
+    instance = (CryptoHelper().require_config().get('instances') or {}).get(name) or {}
+    return BASE_DIR / instance.get('workflows_dir', f'workflows/{name}')
+
+class PrefixedWriter:
+    """stdout que antepone un prefijo a cada línea y la escribe entera de una vez"""
+
+    def __init__(self, prefix: str, stream):
+        self.prefix = prefix
+        self.stream = stream
+        self.pending = ''
+
+    def write(self, text: str):
+        self.pending += text
+        *lines, self.pending = self.pending.split('\n')
+        if lines:
+            # Una sola escritura por bloque: las líneas de los distintos
+            # procesos no se mezclan a mitad
+            self.stream.write(''.join(f"{self.prefix}{line}\n" for line in lines))
+            self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.write('\n')
+        self.stream.flush()
+
+    def isatty(self):
+        return False
+
+def _run_instance(name: str, target: Callable, args, width: int):
+    select(name)
+    sys.stdout = PrefixedWriter(f"[{name:<{width}}] ", sys.__stdout__)
+    try:
+        return target(args)
+    finally:
+        sys.stdout.flush()
+        sys.stdout = sys.__stdout__
+
+def run_instances(names: List[str], target: Callable, args) -> Dict[str, tuple]:
+    """
+    Ejecuta target(args) para cada instancia a la vez, cada una en su proceso
+
+    Devuelve {instancia: (resultado, error)} en el orden de names.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    width = max(len(name) for name in names)
+    results = {}
+    # fork: los hijos heredan la configuración ya descifrada
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=len(names), mp_context=context) as executor:
+        futures = {executor.submit(_run_instance, name, target, args, width): name
+                   for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = (future.result(), None)
+            except Exception as e:
+                results[name] = (None, str(e))
+    return {name: results[name] for name in names}
+
+def print_report(title: str, results: Dict[str, tuple]) -> bool:
+    """Resumen agregado de run_instances; True si ninguna instancia falló"""
+    print("\n" + "="*60)
+    print(f"  📊 {title}")
+    print("="*60 + "\n")
+    width = max(len(name) for name in results)
+    totals: Dict[str, int] = {}
+    for name, (result, error) in results.items():
+        if error is not None:
+            print(f"  ❌ {name:<{width}}  Error: {error}")
+            continue
+        counts = result or {}
+        for label, count in counts.items():
+            totals[label] = totals.get(label, 0) + count
+        summary = ', '.join(f"{count} {label}" for label, count in counts.items())
+        print(f"  ✅ {name:<{width}}  {summary}")
+    if totals:
+        print(f"\n  Total: {', '.join(f'{count} {label}' for label, count in totals.items())}")
+    return all(error is None for _, error in results.values())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Lectura/escritura de JSON de workflows con orjson si está instalado
+Los archivos y cuerpos generados son byte a byte idénticos a los de
+json.dumps(ensure_ascii=False) (con indent=2 o sin espacios), tenga o no
+orjson el sistema
+"""
+import json
+import math
+import re
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional: solo acelera
+    orjson = None
+
+# orjson convierte a float los enteros que no caben en 64 bits; ante cualquier
+# secuencia de 19 o más dígitos se usa json, que los conserva exactos
+_LONG_DIGITS = re.compile(rb'[0-9]{19}')
+
+def loads(data):
+    """Parsea bytes o str"""
+    if orjson:
+        raw = data.encode('utf-8') if isinstance(data, str) else data
+        if not _LONG_DIGITS.search(raw):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # Casos que json sí acepta (NaN, Infinity...)
+                pass
+    return json.loads(data)
+
+def _needs_json(data):
+    """
+    True si data tiene floats que orjson escribe distinto que json: NaN e
+    Infinity (orjson pone null) y los que llevan exponente (1e-05 -> 0.00001,
+    1e+20 -> 1e20)
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if kind is dict:
+            stack.extend(value.values())
+        elif kind is list:
+            stack.extend(value)
+        elif kind is float and (not math.isfinite(value) or 'e' in repr(value)):
+            return True
+    return False
+
+def dumps_workflow(workflow):
+    """Serializa un workflow tal y como se guarda en workflows/ (bytes UTF-8)"""
+    if orjson and not _needs_json(workflow):
+        try:
+            return orjson.dumps(workflow, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # Enteros de más de 64 bits
+            pass
+    return json.dumps(workflow, indent=2, ensure_ascii=False).encode('utf-8')
+
+def dumps_compact(data):
+    """JSON sin espacios para el cuerpo de las peticiones (bytes UTF-8)"""
+    if orjson and not _needs_json(data):
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # Enteros de más de 64 bits
+            pass
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
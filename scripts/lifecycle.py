@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bulk lifecycle operations on n8n workflows: activate, deactivate, delete
+Workflows are selected by name glob, tag, node type or id and processed
+concurrently; a failure in one workflow doesn't stop the rest of the batch
+"""
+
+import sys
+import time
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional
+from pipeline import map_bounded
+from profiler import profiler
+from sync_state import summarize
+
+# action -> (client method, state it leaves the workflow in, label)
+ACTIONS = {
+    'activate': ('activate_workflow', True, 'Activado'),
+    'deactivate': ('deactivate_workflow', False, 'Desactivado'),
+    'delete': ('delete_workflow', None, 'Eliminado'),
+}
+
+def workflow_matches(workflow: Dict, names: Optional[List[str]] = None,
+                     tags: Optional[List[str]] = None,
+                     node_types: Optional[List[str]] = None,
+                     ids: Optional[List[str]] = None) -> bool:
+    """
+    True if the workflow matches every given selector
+
+    Within a selector any value may match: names and node types are
+    case-insensitive globs ('gmail*', '*langchain*'), tags exact names.
+    """
+    if ids and workflow.get('id') not in ids:
+        return False
+    if names:
+        name = (workflow.get('name') or '').lower()
+        if not any(fnmatchcase(name, pattern.lower()) for pattern in names):
+            return False
+    if tags:
+        workflow_tags = {tag.get('name', '').lower() for tag in workflow.get('tags') or []}
+        if not workflow_tags & {tag.lower() for tag in tags}:
+            return False
+    if node_types:
+        types = {(node.get('type') or '').lower() for node in workflow.get('nodes') or []}
+        patterns = [pattern.lower() for pattern in node_types]
+        if not any(fnmatchcase(node_type, pattern) for node_type in types for pattern in patterns):
+            return False
+    return True
+
+class LifecycleRunner:
+    def __init__(self, rate_limit: Optional[float] = None, jobs: int = 8):
+        from n8n_client import N8nClient
+
+        self.jobs = jobs
+        self.client = N8nClient(rate_limit=rate_limit, pool_size=jobs)
+
+    def select(self, names=None, tags=None, node_types=None, ids=None) -> List[Dict]:
+        """Listed (non-archived) workflows matching the selectors, reduced to their summary"""
+        selected = []
+        for workflow in profiler.timed_iter('list', self.client.iter_workflows()):
+            if workflow.get('isArchived', False):
+                continue
+            if workflow_matches(workflow, names, tags, node_types, ids):
+                selected.append(summarize(workflow))
+        return sorted(selected, key=lambda wf: wf.get('name') or '')
+
+    def run(self, action: str, workflows: List[Dict], dry_run: bool = False):
+        """
+        Apply action to every workflow concurrently
+
+        Workflows already in the target state are skipped without a request.
+        Returns (done, skipped, errors).
+        """
+        method, target_state, label = ACTIONS[action]
+        done = skipped = errors = 0
+
+        def apply(workflow):
+            name = workflow.get('name', 'unnamed')
+            if target_state is not None and workflow.get('active') == target_state:
+                return workflow, False, 0.0, None
+            if dry_run:
+                return workflow, True, 0.0, None
+            start = time.perf_counter()
+            try:
+                with profiler.phase(action):
+                    getattr(self.client, method)(workflow['id'])
+                return workflow, True, time.perf_counter() - start, None
+            except Exception as e:
+                return workflow, None, time.perf_counter() - start, f"{name}: {e}"
+
+        start = time.perf_counter()
+        # Results are printed and counted here, in the main thread
+        for workflow, result, elapsed, error in map_bounded(apply, workflows, self.jobs):
+            name = workflow.get('name', 'unnamed')
+            if result is None:
+                errors += 1
+                print(f"❌ Error: {error}")
+            elif result is False:
+                skipped += 1
+                print(f"⏭️  Sin cambios: {name}")
+            elif dry_run:
+                done += 1
+                print(f"🧪 [DRY-RUN] {label}: {name} (ID: {workflow['id']})")
+            else:
+                done += 1
+                print(f"✅ {label}: {name} (ID: {workflow['id']}, {elapsed * 1000:.0f} ms)")
+
+        wall = time.perf_counter() - start
+        print(f"\n📊 Resumen: {done} {label.lower()}s, {skipped} sin cambios, "
+              f"{errors} errores en {wall:.2f} s")
+        return done, skipped, errors
+
+def confirm(action: str, workflows: List[Dict]) -> bool:
+    """Ask before a destructive action (never in a non-interactive shell)"""
+    if not sys.stdin.isatty():
+        print(f"❌ {action} necesita --yes cuando no se ejecuta en una terminal")
+        return False
+    answer = input(f"⚠️  ¿{action} {len(workflows)} workflows en n8n? Escribe 'si' para continuar: ")
+    return answer.strip().lower() in ('si', 'sí', 'yes')
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Persistent index of the local workflow files: stem, id, name and hashes
+Only files whose mtime/size changed since the last run are parsed again, so
+listing and matching thousands of local workflows costs one stat() per file
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from json_io import loads
+from safe_write import write_atomic
+from sync_state import content_hash
+from workflow_content import workflow_hash
+
+INDEX_FILENAME = '.automomo-index.json'
+INDEX_VERSION = 1
+
+class LocalIndex:
+    """Index of file name -> stem, id, name, mtime, size, hash and content_hash"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.path = self.directory / INDEX_FILENAME
+        self.files: Dict[str, Dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load the index from disk (an unreadable index is treated as empty)"""
+        self.files = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable local index {self.path.name}: {e}")
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.files = data.get('files', {})
+
+    def save(self):
+        """Write the index back to disk if anything changed"""
+        if not self.dirty or not self.directory.exists():
+            return
+        data = {'version': INDEX_VERSION, 'files': self.files}
+        write_atomic(self.path, json.dumps(data, indent=2, sort_keys=True,
+                                           ensure_ascii=False).encode('utf-8'))
+        self.dirty = False
+
+    def refresh(self) -> 'LocalIndex':
+        """Stat every workflow file and re-read only the new or modified ones"""
+        seen = set()
+        if self.directory.exists():
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.') or not name.endswith('.json') or not entry.is_file():
+                        continue
+                    seen.add(name)
+                    stat = entry.stat()
+                    cached = self.files.get(name)
+                    if (cached and cached.get('mtime') == stat.st_mtime_ns and
+                            cached.get('size') == stat.st_size):
+                        continue
+                    self.files[name] = self._read(name, stat)
+                    self.dirty = True
+
+        for name in set(self.files) - seen:
+            del self.files[name]
+            self.dirty = True
+        return self
+
+    def _read(self, name: str, stat: os.stat_result) -> Dict:
+        with open(self.directory / name, 'rb') as f:
+            data = f.read()
+        try:
+            workflow = loads(data)
+        except ValueError:
+            workflow = None
+        return self._entry(name, data, workflow if isinstance(workflow, dict) else None, stat)
+
+    def _entry(self, name: str, data: bytes, workflow: Optional[Dict],
+               stat: os.stat_result, local_hash: Optional[str] = None) -> Dict:
+        return {
+            'stem': Path(name).stem,
+            'id': workflow.get('id') if workflow else None,
+            'name': workflow.get('name') if workflow else None,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': content_hash(data),
+            'content_hash': (local_hash or workflow_hash(workflow)) if workflow else None,
+            'valid': workflow is not None,
+        }
+
+    def record(self, name: str, data: bytes, workflow: Dict, local_hash: Optional[str] = None):
+        """Update the entry of a file that was just written (avoids re-reading it later)"""
+        stat = (self.directory / name).stat()
+        self.files[name] = self._entry(name, data, workflow, stat, local_hash)
+        self.dirty = True
+
+    def entries(self) -> Iterator[Dict]:
+        """Entries sorted by file name, each with its 'file' name and 'path'"""
+        for name in sorted(self.files):
+            yield dict(self.files[name], file=name, path=self.directory / name)
+
+    def by_stem(self) -> Dict[str, Dict]:
+        return {entry['stem']: entry for entry in self.entries()}
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita la API pública de n8n (/api/v1/workflows)
+Pensado para pruebas y benchmarks de automomo sin una instancia real:
+paginación por cursor, activate/deactivate, latencia y errores inyectables
+y workflows sintéticos generados a partir de los de workflows/
+"""
+import base64
+import copy
+import json
+import random
+import string
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from sync_state import iter_workflow_files
+
+DEFAULT_PORT = 5678
+DEFAULT_API_KEY = 'mock-api-key'
+MAX_PAGE_SIZE = 250
+
+# Campos que la API acepta al crear/actualizar (el resto es de solo lectura)
+WRITABLE_FIELDS = ['name', 'nodes', 'connections', 'settings', 'staticData']
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+def new_id():
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=16))
+
+def load_templates(workflows_dir=None):
+    """Workflows del repositorio que sirven de plantilla"""
+    workflows_dir = Path(workflows_dir or Path(__file__).parent.parent / 'workflows')
+    templates = []
+    for file_path in sorted(iter_workflow_files(workflows_dir)):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            templates.append(json.load(f))
+    return templates
+
+def synthetic_workflows(count, nodes=None, templates=None, seed=0):
+    """
+    Genera `count` workflows con la forma de las plantillas
+
+    Si se indica `nodes`, cada workflow se recorta o se rellena (duplicando
+    nodos de la plantilla) hasta tener exactamente ese número de nodos.
+    """
+    rng = random.Random(seed)
+    templates = templates or load_templates()
+    if not templates:
+        raise Exception("No hay workflows plantilla en workflows/")
+
+    workflows = []
+    for i in range(count):
+        workflow = copy.deepcopy(templates[i % len(templates)])
+        workflow['id'] = ''.join(rng.choices(string.ascii_letters + string.digits, k=16))
+        workflow['name'] = f"{workflow.get('name', 'workflow')} {i:05d}"
+        workflow['versionId'] = str(uuid.UUID(int=rng.getrandbits(128)))
+        workflow['active'] = False
+        workflow['isArchived'] = False
+
+        if nodes is not None:
+            base_nodes = workflow.get('nodes') or [{'name': 'Node', 'type': 'n8n-nodes-base.noOp',
+                                                    'parameters': {}, 'position': [0, 0]}]
+            padded = base_nodes[:nodes]
+            while len(padded) < nodes:
+                extra = copy.deepcopy(base_nodes[len(padded) % len(base_nodes)])
+                extra['name'] = f"{extra.get('name', 'Node')} {len(padded)}"
+                extra['id'] = str(uuid.UUID(int=rng.getrandbits(128)))
+                padded.append(extra)
+            names = {node.get('name') for node in padded}
+            workflow['nodes'] = padded
+            workflow['connections'] = {source: targets
+                                       for source, targets in workflow.get('connections', {}).items()
+                                       if source in names}
+        workflows.append(workflow)
+    return workflows
+
+class MockN8nServer:
+    """
+    API de n8n en memoria
+
+    Uso:
+        server = MockN8nServer(synthetic_workflows(100), latency=0.02).start()
+        ... server.url ...
+        server.stop()
+    """
+
+    def __init__(self, workflows=None, host='127.0.0.1', port=0, api_key=DEFAULT_API_KEY,
+                 latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0):
+        self.workflows = {wf['id']: wf for wf in (workflows or [])}
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.lock = threading.Lock()
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        """Pone a cero los contadores de peticiones y bytes"""
+        with self.lock:
+            self.stats = {'requests': 0, 'bytes_in': 0, 'bytes_out': 0,
+                          'errors_injected': 0, 'by_method': {}}
+
+    def snapshot_stats(self):
+        with self.lock:
+            return copy.deepcopy(self.stats)
+
+    def start(self):
+        """Arranca el servidor en un hilo en segundo plano"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # --- API ---
+
+    def list_workflows(self, query):
+        limit = min(int(query.get('limit', ['100'])[0]), MAX_PAGE_SIZE)
+        cursor = query.get('cursor', [None])[0]
+        offset = int(base64.b64decode(cursor).decode()) if cursor else 0
+        with self.lock:
+            items = sorted(self.workflows.values(), key=lambda wf: wf['id'])
+            page = copy.deepcopy(items[offset:offset + limit])
+        next_offset = offset + limit
+        next_cursor = (base64.b64encode(str(next_offset).encode()).decode()
+                       if next_offset < len(items) else None)
+        return 200, {'data': page, 'nextCursor': next_cursor}
+
+    def get_workflow(self, workflow_id):
+        with self.lock:
+            workflow = self.workflows.get(workflow_id)
+            return (200, copy.deepcopy(workflow)) if workflow else (404, {'message': 'Not Found'})
+
+    def create_workflow(self, body):
+        if not isinstance(body, dict) or 'name' not in body:
+            return 400, {'message': 'request/body must have required property name'}
+        extra = set(body) - set(WRITABLE_FIELDS)
+        if extra:
+            return 400, {'message': f"request/body must NOT have additional properties: {sorted(extra)}"}
+        workflow = dict(body, id=new_id(), versionId=str(uuid.uuid4()), active=False,
+                        isArchived=False, createdAt=now_iso(), updatedAt=now_iso())
+        with self.lock:
+            self.workflows[workflow['id']] = workflow
+            return 200, copy.deepcopy(workflow)
+
+    def update_workflow(self, workflow_id, body):
+        extra = set(body or {}) - set(WRITABLE_FIELDS)
+        if extra:
+            return 400, {'message': f"request/body must NOT have additional properties: {sorted(extra)}"}
+        with self.lock:
+            workflow = self.workflows.get(workflow_id)
+            if not workflow:
+                return 404, {'message': 'Not Found'}
+            workflow.update(body)
+            workflow['versionId'] = str(uuid.uuid4())
+            workflow['updatedAt'] = now_iso()
+            return 200, copy.deepcopy(workflow)
+
+    def delete_workflow(self, workflow_id):
+        with self.lock:
+            workflow = self.workflows.pop(workflow_id, None)
+        return (200, workflow) if workflow else (404, {'message': 'Not Found'})
+
+    def set_active(self, workflow_id, active):
+        with self.lock:
+            workflow = self.workflows.get(workflow_id)
+            if not workflow:
+                return 404, {'message': 'Not Found'}
+            workflow['active'] = active
+            return 200, copy.deepcopy(workflow)
+
+    def route(self, method, path, query, body):
+        parts = [p for p in path.split('/') if p]
+        if parts[:3] != ['api', 'v1', 'workflows']:
+            return 404, {'message': 'Not Found'}
+        rest = parts[3:]
+        if not rest:
+            if method == 'GET':
+                return self.list_workflows(query)
+            if method == 'POST':
+                return self.create_workflow(body)
+        elif len(rest) == 1:
+            if method == 'GET':
+                return self.get_workflow(rest[0])
+            if method == 'PUT':
+                return self.update_workflow(rest[0], body)
+            if method == 'DELETE':
+                return self.delete_workflow(rest[0])
+        elif len(rest) == 2 and method == 'POST' and rest[1] in ('activate', 'deactivate'):
+            return self.set_active(rest[0], rest[1] == 'activate')
+        return 405, {'message': 'Method Not Allowed'}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+                with server.lock:
+                    server.stats['bytes_out'] += len(data)
+
+            def _handle(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                with server.lock:
+                    server.stats['requests'] += 1
+                    server.stats['bytes_in'] += len(raw)
+                    by_method = server.stats['by_method']
+                    by_method[method] = by_method.get(method, 0) + 1
+
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+
+                if self.headers.get('X-N8N-API-KEY') != server.api_key:
+                    return self._send(401, {'message': 'unauthorized'})
+
+                if server.rate_limit_rate and random.random() < server.rate_limit_rate:
+                    with server.lock:
+                        server.stats['errors_injected'] += 1
+                    return self._send(429, {'message': 'Too Many Requests'}, {'Retry-After': '0'})
+                if server.error_rate and random.random() < server.error_rate:
+                    with server.lock:
+                        server.stats['errors_injected'] += 1
+                    return self._send(503, {'message': 'Service Unavailable'})
+
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    import gzip
+                    raw = gzip.decompress(raw)
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    return self._send(400, {'message': 'invalid JSON body'})
+
+                url = urlparse(self.path)
+                status, payload = server.route(method, url.path, parse_qs(url.query), body)
+                self._send(status, payload)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+        return Handler
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor local que imita la API de n8n')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--api-key', default=DEFAULT_API_KEY)
+    parser.add_argument('--workflows', type=int, default=100,
+                        help='Número de workflows sintéticos')
+    parser.add_argument('--nodes', type=int, default=None,
+                        help='Nodos por workflow (por defecto los de la plantilla)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Latencia añadida por petición, en segundos')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Latencia aleatoria adicional máxima, en segundos')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fracción de peticiones que responden 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='Fracción de peticiones que responden 429')
+    args = parser.parse_args()
+
+    server = MockN8nServer(synthetic_workflows(args.workflows, nodes=args.nodes),
+                           host=args.host, port=args.port, api_key=args.api_key,
+                           latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    print(f"🧪 Mock n8n en {server.url} ({args.workflows} workflows, API key: {args.api_key})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -2,74 +2,318 @@
 """
 Cliente para interactuar con la API de n8n
 """
-import requests
+import gzip
 import json
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from crypto_helper import CryptoHelper
+from urllib.parse import urlparse
+from json_io import dumps_compact, loads
 
-class N8nClient:
-    def __init__(self):
+# Workflows por página al listar (la API de n8n admite hasta 250)
+DEFAULT_PAGE_SIZE = 100
+
+# Conexiones keep-alive por host, timeouts (segundos) y reintentos
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+MAX_RETRY_AFTER = 120
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE'}
+
+# Cuerpos más pequeños no compensan el coste de comprimirlos
+COMPRESS_MIN_BYTES = 1024
+# Respuestas de un servidor (o proxy) que no entiende cuerpos gzip
+COMPRESSION_REJECTED = {400, 415}
+
+class RateLimiter:
+    """Token bucket: como máximo `rate` peticiones por segundo, con ráfagas de `burst`"""
+    
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def reserve(self):
+        """Reserva un token y devuelve cuántos segundos hay que esperar para usarlo"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+# Hooks llamados con un dict por cada petición completada (ver profiler.py)
+_request_hooks = []
+
+def add_request_hook(hook):
+    """Registra hook(event) para todas las peticiones de cualquier cliente"""
+    if hook not in _request_hooks:
+        _request_hooks.append(hook)
+
+def endpoint_template(path):
+    """'/api/v1/workflows/abc123/activate' -> '/api/v1/workflows/{id}/activate'"""
+    return re.sub(r'^(/api/v1/workflows)/[^/]+', r'\1/{id}', path)
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(base_url, rate, burst=None):
+    """Devuelve el limitador compartido para el host de base_url"""
+    host = urlparse(base_url).netloc
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter(rate, burst)
+        return _rate_limiters[host]
+
+class N8nClientBase:
+    """Configuración común a los clientes síncrono y asíncrono"""
+    
+    def __init__(self, rate_limit=None):
+        from crypto_helper import CryptoHelper
+        from instances import n8n_settings
+        
         self.crypto = CryptoHelper()
-        self.config = self.crypto.get_config()
+        self.config = self.crypto.require_config()
         
-        if not self.config:
-            raise Exception("No se pudo cargar la configuración")
+        # Sección n8n, o la de la instancia seleccionada (ver instances.py)
+        self.settings = n8n_settings(self.config)
+        self.base_url = self.settings['url']
+        self.api_key = self.settings['api_key']
+        self.page_size = self.settings.get('page_size', DEFAULT_PAGE_SIZE)
         
-        self.base_url = self.config['n8n']['url']
-        self.api_key = self.config['n8n']['api_key']
+        # Límite de peticiones por segundo, compartido por todos los clientes del mismo host
+        rate_limit = rate_limit or self.settings.get('rate_limit')
+        self.rate_limiter = None
+        if rate_limit:
+            self.rate_limiter = get_rate_limiter(self.base_url, rate_limit,
+                                                 self.settings.get('rate_burst'))
         self.headers = {
             'X-N8N-API-KEY': self.api_key,
             'Content-Type': 'application/json'
         }
+        
+        # Timeouts (conexión, lectura) y reintentos para cada petición
+        self.timeout = (self.settings.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+                        self.settings.get('read_timeout', DEFAULT_READ_TIMEOUT))
+        self.max_retries = self.settings.get('retries', DEFAULT_RETRIES)
+        self.retry_backoff = self.settings.get('retry_backoff', DEFAULT_RETRY_BACKOFF)
+        
+        # Cuerpos JSON compactos y, mientras el servidor los acepte, con gzip
+        self.compress_requests = self.settings.get('compress_requests', True)
+        # Cuerpos enviados: peticiones, bytes por la red y bytes sin comprimir
+        self.sent = {'requests': 0, 'bytes': 0, 'raw_bytes': 0}
+        self._sent_lock = threading.Lock()
+    
+    def _encode_body(self, raw, compress=True):
+        """Cuerpo y cabeceras para un JSON ya serializado (gzip si está activado y compensa)"""
+        headers = {'Content-Type': 'application/json'}
+        if compress and self.compress_requests and len(raw) >= COMPRESS_MIN_BYTES:
+            headers['Content-Encoding'] = 'gzip'
+            return gzip.compress(raw, compresslevel=6), headers
+        return raw, headers
+    
+    def _count_sent(self, raw, body):
+        """Suma un cuerpo enviado a self.sent"""
+        if raw is None:
+            return
+        with self._sent_lock:
+            self.sent['requests'] += 1
+            self.sent['bytes'] += len(body)
+            self.sent['raw_bytes'] += len(raw)
+    
+    def _disable_compression(self):
+        if self.compress_requests:
+            self.compress_requests = False
+            print("⚠️  El servidor no acepta cuerpos gzip: se envían sin comprimir")
+    
+    def _notify(self, method, path, started, status=None, retries=0,
+                bytes_out=0, bytes_in=0, error=None):
+        """Informa de una petición completada a los hooks registrados"""
+        if not _request_hooks:
+            return
+        event = {
+            'method': method,
+            'endpoint': endpoint_template(path),
+            'status': status,
+            'elapsed': time.perf_counter() - started,
+            'retries': retries,
+            'bytes_out': bytes_out,
+            'bytes_in': bytes_in,
+            'error': error,
+        }
+        for hook in _request_hooks:
+            hook(event)
+    
+    def _is_retryable(self, status_code, idempotent):
+        """429 siempre se puede reintentar (la petición no llegó a procesarse); 5xx solo si es idempotente"""
+        return status_code == 429 or (idempotent and status_code in RETRY_STATUSES)
+    
+    def _retry_delay(self, attempt, retry_after=None):
+        """Segundos a esperar antes del siguiente intento (Retry-After o backoff exponencial)"""
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    when = parsedate_to_datetime(retry_after)
+                    delay = when.timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0), MAX_RETRY_AFTER)
+        base = self.retry_backoff * (2 ** attempt)
+        return base + random.uniform(0, base)
+
+class N8nClient(N8nClientBase):
+    def __init__(self, rate_limit=None, pool_size=None):
+        # requests se importa aquí: los comandos que no llaman a la API no pagan su carga
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        super().__init__(rate_limit=rate_limit)
+        self.transient_errors = (requests.ConnectionError, requests.Timeout)
+        
+        # Sesión con pool de conexiones keep-alive (al menos una por worker)
+        self.pool_size = max(pool_size or 0,
+                             self.settings.get('pool_size', DEFAULT_POOL_SIZE))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.headers)
+    
+    def _throttle(self):
+        """Espera a que el limitador de peticiones lo permita"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+    
+    def _request(self, method, path, idempotent=None, **kwargs):
+        """
+        Hace una petición a la API reintentando errores transitorios
+        
+        Las peticiones idempotentes se reintentan ante errores de conexión,
+        timeouts y respuestas 429/5xx; el resto solo ante 429 (la petición no
+        llegó a procesarse). Un cuerpo json= se envía compacto y con gzip; si
+        el servidor lo rechaza se reenvía sin comprimir y, si así funciona, no
+        se vuelve a comprimir.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = f"{self.base_url}{path}"
+        kwargs.setdefault('timeout', self.timeout)
+        raw = None
+        if 'json' in kwargs:
+            raw = dumps_compact(kwargs.pop('json'))
+            kwargs['data'], kwargs['headers'] = self._encode_body(raw)
+        compressed = 'Content-Encoding' in kwargs.get('headers', {})
+        probing = False
+        attempt = 0
+        started = time.perf_counter()
+        
+        while True:
+            self._throttle()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except self.transient_errors as e:
+                if not idempotent or attempt >= self.max_retries:
+                    self._notify(method, path, started, retries=attempt, error=type(e).__name__)
+                    raise
+                delay = self._retry_delay(attempt)
+            else:
+                self._count_sent(raw, kwargs.get('data'))
+                if compressed and response.status_code in COMPRESSION_REJECTED:
+                    response.close()
+                    kwargs['data'], kwargs['headers'] = self._encode_body(raw, compress=False)
+                    compressed = False
+                    probing = True
+                    continue
+                retryable = self._is_retryable(response.status_code, idempotent)
+                if not retryable or attempt >= self.max_retries:
+                    if probing and response.ok:
+                        self._disable_compression()
+                    if _request_hooks:
+                        body = response.request.body or b''
+                        self._notify(method, path, started, status=response.status_code,
+                                     retries=attempt, bytes_out=len(body),
+                                     bytes_in=len(response.content))
+                    response.raise_for_status()
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                response.close()
+            
+            attempt += 1
+            time.sleep(delay)
+    
+    def _request_json(self, method, path, **kwargs):
+        """Hace una petición y devuelve su JSON (con orjson si está instalado)"""
+        return loads(self._request(method, path, **kwargs).content)
+    
+    def close(self):
+        """Cierra las conexiones del pool"""
+        self.session.close()
+    
+    def list_workflows_page(self, limit=None, cursor=None):
+        """Obtiene una página de workflows ({'data': [...], 'nextCursor': ...})"""
+        params = {'limit': limit or self.page_size}
+        if cursor:
+            params['cursor'] = cursor
+        return self._request_json('GET', '/api/v1/workflows', params=params)
+    
+    def iter_workflows(self, page_size=None):
+        """Itera sobre todos los workflows siguiendo la paginación por cursor"""
+        cursor = None
+        while True:
+            page = self.list_workflows_page(limit=page_size, cursor=cursor)
+            yield from page.get('data', [])
+            cursor = page.get('nextCursor')
+            if not cursor:
+                break
     
     def list_workflows(self):
-        """Lista todos los workflows"""
-        url = f"{self.base_url}/api/v1/workflows"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        """Lista todos los workflows (todas las páginas)"""
+        return {'data': list(self.iter_workflows())}
     
     def get_workflow(self, workflow_id):
         """Obtiene un workflow específico"""
-        url = f"{self.base_url}/api/v1/workflows/{workflow_id}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._request_json('GET', f"/api/v1/workflows/{workflow_id}")
     
     def create_workflow(self, workflow_data):
         """Crea un nuevo workflow"""
-        url = f"{self.base_url}/api/v1/workflows"
-        response = requests.post(url, headers=self.headers, json=workflow_data)
-        response.raise_for_status()
-        return response.json()
+        return self._request_json('POST', '/api/v1/workflows', json=workflow_data)
     
     def update_workflow(self, workflow_id, workflow_data):
         """Actualiza un workflow existente"""
-        url = f"{self.base_url}/api/v1/workflows/{workflow_id}"
-        response = requests.put(url, headers=self.headers, json=workflow_data)
-        response.raise_for_status()
-        return response.json()
+        return self._request_json('PUT', f"/api/v1/workflows/{workflow_id}",
+                                  json=workflow_data)
     
     def delete_workflow(self, workflow_id):
         """Elimina un workflow"""
-        url = f"{self.base_url}/api/v1/workflows/{workflow_id}"
-        response = requests.delete(url, headers=self.headers)
-        response.raise_for_status()
+        self._request('DELETE', f"/api/v1/workflows/{workflow_id}")
         return True
     
     def activate_workflow(self, workflow_id):
         """Activa un workflow"""
-        url = f"{self.base_url}/api/v1/workflows/{workflow_id}/activate"
-        response = requests.post(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._request_json('POST', f"/api/v1/workflows/{workflow_id}/activate",
+                                  idempotent=True)
     
     def deactivate_workflow(self, workflow_id):
         """Desactiva un workflow"""
-        url = f"{self.base_url}/api/v1/workflows/{workflow_id}/deactivate"
-        response = requests.post(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._request_json('POST', f"/api/v1/workflows/{workflow_id}/deactivate",
+                                  idempotent=True)
 
 def main():
     import sys
@@ -84,11 +328,13 @@ def main():
         command = sys.argv[1]
         
         if command == "list":
-            workflows = client.list_workflows()
-            print(f"\n📋 Total workflows: {len(workflows.get('data', []))}\n")
-            for wf in workflows.get('data', []):
+            total = 0
+            print()
+            for wf in client.iter_workflows():
                 status = "✅" if wf.get('active') else "⭕"
                 print(f"{status} [{wf['id']}] {wf['name']}")
+                total += 1
+            print(f"\n📋 Total workflows: {total}\n")
         
         elif command == "get":
             if len(sys.argv) < 3:
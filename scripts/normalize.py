@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Normalization of pulled workflows: removal of volatile fields
+Rules are field paths ('shared[].project', 'staticData.**.lastTimeChecked')
+compiled into a single automaton, so every workflow is cleaned in one walk
+that only descends into the branches some rule can still match
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Fields that change without any edit to the workflow (executions, sharing,
+# activation, instance metadata) and only add noise to git diffs
+DEFAULT_RULES = [
+    'shared[].project',
+    'versionCounter',
+    'updatedAt',
+    'triggerCount',
+    'meta',
+    'staticData.**.lastTimeChecked',
+    'staticData.**.possibleDuplicates',
+]
+
+# A path segment: a key ('nodes'), any key ('*') or any depth ('**'),
+# followed by any number of '[]' (every item of a list)
+_SEGMENT = re.compile(r'(\*\*|\*|[^.\[\]*]+)((?:\[\])*)')
+
+def parse_rule(rule: str) -> List[str]:
+    """'shared[].project' -> ['shared', '[]', 'project']"""
+    segments = []
+    for part in rule.split('.'):
+        match = _SEGMENT.fullmatch(part)
+        if not match:
+            raise ValueError(f"Invalid normalize rule '{rule}'")
+        segments.append(match.group(1))
+        segments.extend(['[]'] * (len(match.group(2)) // 2))
+    if segments[-1] in ('[]', '**'):
+        raise ValueError(f"Invalid normalize rule '{rule}': it must end with a field name")
+    return segments
+
+class _Node:
+    """Position in the trie of rule paths ('**' nodes match themselves again one level down)"""
+    __slots__ = ('children', 'loop', 'rule')
+
+    def __init__(self, loop: bool = False):
+        self.children: Dict[str, '_Node'] = {}
+        self.loop = loop
+        self.rule: Optional[int] = None
+
+class _State:
+    """Set of trie nodes reached by a path; transitions are built on first use"""
+    __slots__ = ('nodes', 'rule', 'keys', 'item', 'normalizer')
+
+    def __init__(self, nodes: frozenset, normalizer: 'Normalizer'):
+        self.nodes = nodes
+        rules = [node.rule for node in nodes if node.rule is not None]
+        self.rule = min(rules) if rules else None
+        self.keys: Dict[str, Optional['_State']] = {}
+        self.item: Optional['_State'] = None
+        self.normalizer = normalizer
+
+    def step(self, key: str) -> Optional['_State']:
+        try:
+            return self.keys[key]
+        except KeyError:
+            with self.normalizer._compile_lock:
+                state = self.keys[key] = self.normalizer._state(
+                    child for node in self.nodes
+                    for child in (node.children.get(key), node.children.get('*'),
+                                  node if node.loop else None) if child)
+            return state
+
+class Normalizer:
+    """
+    Compiled rule set; apply() cleans a workflow in place and counts, per rule,
+    how many fields it removed (thread-safe, one instance can serve a whole pull)
+    """
+
+    def __init__(self, rules: Iterable[str] = DEFAULT_RULES):
+        self.rules = list(dict.fromkeys(rules))
+        self.counts = [0] * len(self.rules)
+        self._lock = threading.Lock()
+        # States are built lazily, possibly from several pull threads
+        self._compile_lock = threading.RLock()
+        self._states: Dict[frozenset, Optional[_State]] = {}
+
+        root = _Node()
+        for index, rule in enumerate(self.rules):
+            node = root
+            for segment in parse_rule(rule):
+                if segment not in node.children:
+                    node.children[segment] = _Node(loop=segment == '**')
+                node = node.children[segment]
+            if node.rule is None:
+                node.rule = index
+        self.root = self._state([root])
+
+    def _state(self, nodes) -> Optional[_State]:
+        # '**' also matches zero levels: reaching a node reaches its '**' child
+        closure, stack = set(), list(nodes)
+        while stack:
+            node = stack.pop()
+            if node not in closure:
+                closure.add(node)
+                if '**' in node.children:
+                    stack.append(node.children['**'])
+        closure = frozenset(closure)
+        if not closure:
+            return None
+        state = self._states.get(closure)
+        if state is None:
+            state = self._states[closure] = _State(closure, self)
+            # List items have no key: only '[]' and '**' go through them
+            state.item = self._state(
+                child for node in closure
+                for child in (node.children.get('[]'), node if node.loop else None) if child)
+        return state
+
+    def apply(self, workflow: Dict) -> Dict:
+        counts = [0] * len(self.rules)
+        if self.root is not None:
+            self._walk(workflow, self.root, counts)
+        if any(counts):
+            with self._lock:
+                for index, count in enumerate(counts):
+                    self.counts[index] += count
+        return workflow
+
+    def _walk(self, value, state: _State, counts: List[int]):
+        if isinstance(value, dict):
+            remove = []
+            for key, child in value.items():
+                next_state = state.step(key)
+                if next_state is None:
+                    continue
+                if next_state.rule is not None:
+                    remove.append(key)
+                    counts[next_state.rule] += 1
+                elif isinstance(child, (dict, list)):
+                    self._walk(child, next_state, counts)
+            for key in remove:
+                del value[key]
+        elif isinstance(value, list) and state.item is not None:
+            for child in value:
+                if isinstance(child, (dict, list)):
+                    self._walk(child, state.item, counts)
+
+    def removed(self) -> Dict[str, int]:
+        """Fields removed so far by each rule (rules that removed nothing are left out)"""
+        return {rule: count for rule, count in zip(self.rules, self.counts) if count}
+
+def configured_rules(config: Optional[Dict] = None) -> List[str]:
+    """
+    Rules from the 'normalize' section of the config:
+    {"defaults": true, "remove": [extra paths], "keep": [default paths to disable]}
+    """
+    if config is None:
+        from crypto_helper import CryptoHelper
+        config = CryptoHelper().require_config()
+    settings = config.get('normalize') or {}
+    rules = list(DEFAULT_RULES) if settings.get('defaults', True) else []
+    rules.extend(settings.get('remove', []))
+    keep = set(settings.get('keep', []))
+    return [rule for rule in rules if rule not in keep]
+
+_normalizer = None
+
+def get_normalizer() -> Normalizer:
+    """Normalizer for the configured rules, compiled once per process"""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = Normalizer(configured_rules())
+    return _normalizer
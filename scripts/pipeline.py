@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Ejecución concurrente con un número acotado de elementos en vuelo
+A diferencia de executor.map/asyncio.gather, los elementos se van sacando del
+iterable solo cuando hay hueco, así que la memoria no crece con el número de
+workflows
+"""
+
+# Workflows procesados en paralelo por defecto (pull, push, rollback)
+DEFAULT_JOBS = 4
+
+def map_bounded(fn, items, jobs, in_flight=None):
+    """
+    Aplica fn a cada elemento con `jobs` hilos y devuelve los resultados según
+    terminan, sin tener más de `in_flight` (por defecto 2 * jobs) pendientes
+    """
+    if jobs <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    in_flight = in_flight or 2 * jobs
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    pending = set()
+    try:
+        for item in items:
+            pending.add(executor.submit(fn, item))
+            if len(pending) >= in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # Si algo falla (o se deja de consumir) no se empiezan más tareas
+        executor.shutdown(wait=True, cancel_futures=True)
+
+async def amap_bounded(fn, items, in_flight):
+    """
+    Versión asyncio de map_bounded: fn es una corrutina e items un iterable
+    normal o asíncrono; async for sobre el resultado
+    """
+    import asyncio
+
+    async def iterate():
+        if hasattr(items, '__aiter__'):
+            async for item in items:
+                yield item
+        else:
+            for item in items:
+                yield item
+
+    pending = set()
+    try:
+        async for item in iterate():
+            pending.add(asyncio.ensure_future(fn(item)))
+            if len(pending) >= in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
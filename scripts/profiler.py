@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Instrumentación de automomo: métricas por endpoint de la API y tiempos por fase
+Desactivado por defecto (coste casi nulo); se activa con --profile
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.command = None
+        self.started = None
+        self.finished = None
+        self.endpoints = {}
+        self.phases = {}
+
+    def enable(self, command=None):
+        """Empieza a registrar métricas (y engancha el registro de peticiones a los clientes)"""
+        from n8n_client import add_request_hook
+        self.enabled = True
+        self.command = command
+        self.started = time.perf_counter()
+        add_request_hook(self.record_request)
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def record_request(self, event):
+        """Hook de N8nClient/AsyncN8nClient: una llamada por petición completada"""
+        if not self.enabled:
+            return
+        key = (event['method'], event['endpoint'])
+        with self.lock:
+            stats = self.endpoints.setdefault(key, {
+                'count': 0, 'errors': 0, 'retries': 0,
+                'bytes_in': 0, 'bytes_out': 0, 'latencies': []
+            })
+            stats['count'] += 1
+            stats['retries'] += event.get('retries', 0)
+            stats['bytes_in'] += event.get('bytes_in', 0)
+            stats['bytes_out'] += event.get('bytes_out', 0)
+            stats['latencies'].append(event['elapsed'])
+            if event.get('error') or (event.get('status') or 0) >= 400:
+                stats['errors'] += 1
+
+    def add_phase(self, name, elapsed):
+        with self.lock:
+            stats = self.phases.setdefault(name, {'count': 0, 'total': 0.0})
+            stats['count'] += 1
+            stats['total'] += elapsed
+
+    @contextmanager
+    def phase(self, name):
+        """Cronometra un bloque (los tiempos de varios hilos se suman)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def timed_iter(self, name, iterable):
+        """Itera cronometrando solo el tiempo de obtener cada elemento"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_phase(name, time.perf_counter() - start)
+                return
+            self.add_phase(name, time.perf_counter() - start)
+            yield item
+
+    def summary(self):
+        """Métricas agregadas como dict serializable"""
+        with self.lock:
+            endpoints = []
+            for (method, endpoint), stats in sorted(self.endpoints.items()):
+                latencies = sorted(stats['latencies'])
+                endpoints.append({
+                    'method': method,
+                    'endpoint': endpoint,
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'bytes_in': stats['bytes_in'],
+                    'bytes_out': stats['bytes_out'],
+                    'total_s': sum(latencies),
+                    'p50_s': percentile(latencies, 0.50),
+                    'p95_s': percentile(latencies, 0.95),
+                    'p99_s': percentile(latencies, 0.99),
+                })
+            phases = [{'phase': name, 'count': stats['count'], 'total_s': stats['total']}
+                      for name, stats in sorted(self.phases.items(),
+                                                key=lambda item: -item[1]['total'])]
+        end = self.finished or time.perf_counter()
+        return {
+            'command': self.command,
+            'wall_s': end - self.started if self.started else 0.0,
+            'endpoints': endpoints,
+            'phases': phases,
+        }
+
+    def print_report(self):
+        summary = self.summary()
+        print("\n" + "="*60)
+        print(f"  ⏱️  Perfil: {summary['command']} ({summary['wall_s']:.3f} s)")
+        print("="*60 + "\n")
+
+        if summary['endpoints']:
+            print(f"{'Petición':<38} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                  f"{'KB in':>9} {'KB out':>9} {'retry':>6} {'err':>5}")
+            for row in summary['endpoints']:
+                label = f"{row['method']} {row['endpoint']}"
+                print(f"{label:<38} {row['count']:>6} {row['p50_s'] * 1000:>8.1f} "
+                      f"{row['p95_s'] * 1000:>8.1f} {row['p99_s'] * 1000:>8.1f} "
+                      f"{row['bytes_in'] / 1024:>9.1f} {row['bytes_out'] / 1024:>9.1f} "
+                      f"{row['retries']:>6} {row['errors']:>5}")
+            print()
+
+        if summary['phases']:
+            print(f"{'Fase':<20} {'n':>8} {'total s':>10}   (suma de todos los workers)")
+            for row in summary['phases']:
+                print(f"{row['phase']:<20} {row['count']:>8} {row['total_s']:>10.3f}")
+            print()
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def to_prometheus(self):
+        """Formato textfile del node_exporter de Prometheus"""
+        summary = self.summary()
+        command = summary['command'] or 'unknown'
+        lines = [
+            '# HELP automomo_command_duration_seconds Wall time of the last automomo run',
+            '# TYPE automomo_command_duration_seconds gauge',
+            f'automomo_command_duration_seconds{{command="{command}"}} {summary["wall_s"]:.6f}',
+        ]
+        metrics = [
+            ('requests_total', 'count', 'API requests'),
+            ('request_errors_total', 'errors', 'API requests that failed'),
+            ('request_retries_total', 'retries', 'API request retries'),
+            ('request_bytes_received_total', 'bytes_in', 'Response body bytes'),
+            ('request_bytes_sent_total', 'bytes_out', 'Request body bytes'),
+        ]
+        for metric, field, help_text in metrics:
+            lines.append(f'# HELP automomo_{metric} {help_text} in the last run')
+            lines.append(f'# TYPE automomo_{metric} gauge')
+            for row in summary['endpoints']:
+                labels = f'command="{command}",method="{row["method"]}",endpoint="{row["endpoint"]}"'
+                lines.append(f'automomo_{metric}{{{labels}}} {row[field]}')
+
+        lines.append('# HELP automomo_request_duration_seconds API request latency in the last run')
+        lines.append('# TYPE automomo_request_duration_seconds summary')
+        for row in summary['endpoints']:
+            labels = f'command="{command}",method="{row["method"]}",endpoint="{row["endpoint"]}"'
+            for quantile, field in (('0.5', 'p50_s'), ('0.95', 'p95_s'), ('0.99', 'p99_s')):
+                lines.append(f'automomo_request_duration_seconds{{{labels},quantile="{quantile}"}} '
+                             f'{row[field]:.6f}')
+            lines.append(f'automomo_request_duration_seconds_sum{{{labels}}} {row["total_s"]:.6f}')
+            lines.append(f'automomo_request_duration_seconds_count{{{labels}}} {row["count"]}')
+
+        lines.append('# HELP automomo_phase_duration_seconds Time spent per phase in the last run')
+        lines.append('# TYPE automomo_phase_duration_seconds gauge')
+        for row in summary['phases']:
+            lines.append(f'automomo_phase_duration_seconds{{command="{command}",phase="{row["phase"]}"}} '
+                         f'{row["total_s"]:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Escribe de forma atómica para que el node_exporter nunca lea un archivo a medias"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+# Instancia compartida por todo el proceso
+profiler = Profiler()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Escritura atómica de archivos
+Cada archivo se escribe en un temporal del mismo directorio, se hace fsync
+y se renombra encima del destino: una ejecución interrumpida, o un corte de
+luz, deja el archivo anterior o el nuevo, nunca un JSON a medias o vacío.
+Los archivos cuyo contenido no cambia no se tocan (ni su mtime), y los
+renombrados de un lote se hacen persistentes con un único fsync del
+directorio al final
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+# Los temporales empiezan por punto, así que los índices los ignoran, y
+# coinciden con el patrón .automomo-* de .gitignore
+TEMP_PREFIX = '.automomo-tmp-'
+
+def write_atomic(path, data: bytes):
+    """Escribe data en path mediante un temporal y os.replace"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            # Los datos deben estar en disco antes del renombrado: si no, tras
+            # un corte de luz el archivo renombrado puede quedar vacío
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crea el archivo con 0600: se respetan los permisos del anterior
+        try:
+            os.chmod(tmp_path, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o666 & ~_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_if_changed(path, data: bytes) -> bool:
+    """write_atomic solo si el contenido es distinto; True si se escribió"""
+    path = Path(path)
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    write_atomic(path, data)
+    return True
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+def fsync_directory(directory):
+    """Hace persistentes los renombrados hechos en el directorio"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Algunos sistemas de archivos no admiten fsync de directorios
+        pass
+    finally:
+        os.close(fd)
+
+class BatchWriter:
+    """
+    Escribe un lote de archivos en un directorio
+
+    write() solo escribe si los bytes cambian; sync() (o salir del bloque
+    with) hace un fsync del directorio si se escribió algo.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.written = 0
+
+    def write(self, name: str, data: bytes) -> bool:
+        """Escribe data en directory/name; True si el archivo cambió"""
+        if not write_if_changed(self.directory / name, data):
+            return False
+        self.written += 1
+        return True
+
+    def sync(self):
+        if self.written:
+            fsync_directory(self.directory)
+            self.written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.sync()
+        return False
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Sharded sync: split pull/push/status across several runners
+A workflow belongs to shard i/N by a stable hash of its kebab-case file name,
+so every runner of a CI matrix picks the same disjoint subset (and name
+collisions, which share a file, always land in the same shard). Each run
+leaves a summary next to the sync state; merge_shards() combines the files,
+state entries and summaries of all the shards
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SUMMARY_PREFIX = '.automomo-shard-'
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """'2/4' -> (2, 4); shards are numbered from 1"""
+    import argparse
+
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"formato inválido '{value}': usa i/N, p. ej. 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard fuera de rango '{value}': i debe ir de 1 a N")
+    return index, count
+
+def shard_of(key: str, count: int) -> int:
+    """Shard (1..count) of a kebab-case workflow file stem"""
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+def in_shard(key: str, shard: Optional[Tuple[int, int]]) -> bool:
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(key, count) == index
+
+def summary_path(workflows_dir: Path, command: str, shard: Tuple[int, int]) -> Path:
+    index, count = shard
+    return Path(workflows_dir) / f"{SUMMARY_PREFIX}{command}-{index}-of-{count}.json"
+
+def write_summary(workflows_dir: Path, command: str, shard: Tuple[int, int], counts: Dict,
+                  error: Optional[str] = None):
+    """Leave the result of one shard's run (and its error, if it failed) for merge_shards"""
+    from safe_write import write_atomic
+
+    data = {'command': command, 'shard': list(shard), 'counts': counts or {}}
+    if error is not None:
+        data['error'] = error
+    write_atomic(summary_path(workflows_dir, command, shard),
+                 json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+
+def read_summaries(directory: Path) -> List[Dict]:
+    summaries = []
+    for path in sorted(Path(directory).glob(f"{SUMMARY_PREFIX}*.json")):
+        try:
+            summaries.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignorando resumen de shard ilegible {path}: {e}")
+    return summaries
+
+def merge_shards(sources: List[Path], target: Path) -> Dict[str, tuple]:
+    """
+    Combine the output of every shard into target
+
+    Each source is the workflows directory of one shard's run. Only the
+    files and state entries that belong to that shard are taken from it, so
+    stale copies of other shards' files in a source are ignored, and they
+    replace the target's files and state entries of that shard: a file of
+    the shard the source no longer has is deleted. Every source is checked
+    before anything is written. Returns the per-shard counts as
+    {label: (counts, error)}, like instances.run_instances.
+    """
+    from safe_write import BatchWriter
+    from sync_state import SyncState, iter_workflow_files
+
+    # (source, shard, summaries) of every source with results
+    runs = []
+    for source in sources:
+        source = Path(source)
+        summaries = read_summaries(source)
+        if not summaries:
+            print(f"⚠️  {source}: sin resumen de shard, se omite")
+            continue
+        shards = {tuple(summary['shard']) for summary in summaries}
+        if len(shards) > 1:
+            raise Exception(f"{source} contiene resultados de varios shards: {sorted(shards)}")
+        runs.append((source, shards.pop(), summaries))
+    totals = {count for _, (_, count), _ in runs}
+    if len(totals) > 1:
+        raise Exception(f"Los shards vienen de ejecuciones con distinto N: {sorted(totals)}")
+
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    state = SyncState(target)
+    writer = BatchWriter(target)
+    # (index, count) -> merged counts, and the errors of the runs that failed
+    merged: Dict[Tuple[int, int], Dict] = {}
+    failed: Dict[Tuple[int, int], List[str]] = {}
+
+    for source, shard, summaries in runs:
+        names = set()
+        for path in iter_workflow_files(source):
+            if in_shard(path.stem, shard):
+                writer.write(path.name, path.read_bytes())
+                names.add(path.name)
+        for path in list(iter_workflow_files(target)):
+            if in_shard(path.stem, shard) and path.name not in names:
+                path.unlink()
+                print(f"🗑️  {path.name}: ya no está en el shard {shard[0]}/{shard[1]}")
+
+        source_state = SyncState(source)
+        with state.lock:
+            # The source's entries are the whole shard: drop the target's old ones
+            for workflow_id, entry in list(state.workflows.items()):
+                if in_shard(Path(entry['file']).stem, shard):
+                    del state.workflows[workflow_id]
+            for workflow_id, entry in source_state.workflows.items():
+                if in_shard(Path(entry['file']).stem, shard):
+                    entry = dict(entry)
+                    copied = target / entry['file']
+                    if copied.exists():
+                        stat = copied.stat()
+                        entry['mtime'], entry['size'] = stat.st_mtime_ns, stat.st_size
+                    state.workflows[workflow_id] = entry
+
+        counts = merged.setdefault(shard, {})
+        for summary in summaries:
+            if summary.get('error'):
+                failed.setdefault(shard, []).append(f"{summary['command']}: {summary['error']}")
+            for name, count in summary.get('counts', {}).items():
+                key = f"{name} ({summary['command']})" if len(summaries) > 1 else name
+                counts[key] = counts.get(key, 0) + count
+        print(f"📦 shard {shard[0]}/{shard[1]}: {len(names)} workflows desde {source}")
+
+    writer.sync()
+    state.save()
+
+    results = {}
+    for count in totals:
+        for index in range(1, count + 1):
+            counts = merged.get((index, count))
+            if counts is None:
+                results[f"shard {index}/{count}"] = (None, "sin resultados para este shard")
+            else:
+                errors = failed.get((index, count))
+                results[f"shard {index}/{count}"] = (counts, '; '.join(errors) if errors else None)
+    return results
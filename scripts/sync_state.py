@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Local sync state: what was last pulled from (or pushed to) n8n for each workflow
+Lets pull skip workflows whose versionId/updatedAt did not change, and push
+skip workflows whose deployable content hash did not change
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from json_io import loads
+from safe_write import write_if_changed
+from workflow_content import workflow_hash
+
+STATE_FILENAME = '.automomo-state.json'
+STATE_VERSION = 1
+
+# Fields of a listed workflow that sync decisions need (the list API also
+# returns every node, which is too much to keep around for thousands of workflows)
+SUMMARY_FIELDS = ('id', 'name', 'versionId', 'updatedAt', 'active', 'isArchived')
+
+def summarize(workflow: Dict) -> Dict:
+    """Listed workflow reduced to SUMMARY_FIELDS"""
+    return {field: workflow[field] for field in SUMMARY_FIELDS if field in workflow}
+
+def content_hash(data: bytes) -> str:
+    """sha256 of the serialized workflow file"""
+    return hashlib.sha256(data).hexdigest()
+
+def iter_workflow_files(workflows_dir: Path) -> Iterator[Path]:
+    """Workflow JSON files in a directory (skips automomo's own dotfiles)"""
+    for file_path in workflows_dir.glob('*.json'):
+        if file_path.name.startswith('.'):
+            continue
+        yield file_path
+
+class SyncState:
+    """Index of workflow id -> versionId, updatedAt, file name and content hashes"""
+
+    def __init__(self, workflows_dir: Path):
+        self.workflows_dir = Path(workflows_dir)
+        self.path = self.workflows_dir / STATE_FILENAME
+        self.workflows: Dict[str, Dict] = {}
+        # record() may be called from deploy worker threads
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the index from disk (an unreadable index is treated as empty)"""
+        self.workflows = {}
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable sync state {self.path.name}: {e}")
+            return
+        if data.get('version') == STATE_VERSION:
+            self.workflows = data.get('workflows', {})
+
+    def save(self):
+        """Write the index back to disk (untouched if nothing changed)"""
+        with self.lock:
+            data = {'version': STATE_VERSION, 'workflows': dict(self.workflows)}
+        write_if_changed(self.path, json.dumps(data, indent=2, sort_keys=True,
+                                               ensure_ascii=False).encode('utf-8'))
+
+    def get(self, workflow_id: str) -> Optional[Dict]:
+        return self.workflows.get(workflow_id)
+
+    def is_current(self, workflow: Dict, filename: str) -> bool:
+        """
+        True if the listed workflow matches what was last pulled and the
+        local file is still the one that was written
+        """
+        entry = self.workflows.get(workflow.get('id'))
+        if not entry or entry.get('file') != filename:
+            return False
+        if self.remote_changed(entry, workflow):
+            return False
+        return self.file_matches(entry)
+
+    def remote_changed(self, entry: Dict, remote_workflow: Dict) -> bool:
+        """True if the listed workflow is not the version recorded in entry"""
+        return (entry.get('versionId') != remote_workflow.get('versionId') or
+                entry.get('updatedAt') != remote_workflow.get('updatedAt'))
+
+    def local_changed(self, entry: Dict) -> bool:
+        """
+        True if the local file's deployable content differs from the one
+        recorded in entry (only files whose stat changed are read)
+        """
+        if self.file_matches(entry):
+            return False
+        try:
+            with open(self.workflows_dir / entry['file'], 'rb') as f:
+                workflow = loads(f.read())
+        except (OSError, ValueError):
+            return True
+        return workflow_hash(workflow) != entry.get('content_hash')
+
+    def file_matches(self, entry: Dict) -> bool:
+        """Check the local file against the recorded hash (stat first, then content)"""
+        file_path = self.workflows_dir / entry['file']
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        if stat.st_mtime_ns == entry.get('mtime') and stat.st_size == entry.get('size'):
+            return True
+        with open(file_path, 'rb') as f:
+            return content_hash(f.read()) == entry.get('hash')
+
+    def is_deployed(self, remote_workflow: Dict, local_hash: str) -> bool:
+        """
+        True if n8n still holds the version recorded at the last pull/push
+        and its deployable content had this hash
+        """
+        entry = self.workflows.get(remote_workflow.get('id'))
+        return (bool(entry) and bool(local_hash) and
+                entry.get('content_hash') == local_hash and
+                entry.get('versionId') == remote_workflow.get('versionId') and
+                entry.get('updatedAt') == remote_workflow.get('updatedAt'))
+
+    def record(self, workflow: Dict, filename: str, data: bytes,
+               local_hash: Optional[str] = None, static_hash: Optional[str] = None):
+        """
+        Remember the version written (or confirmed) for a workflow
+
+        data is the local file content, local_hash the hash of its
+        deployable fields (see workflow_content.workflow_hash) and
+        static_hash the hash of its staticData, which push leaves out of
+        the update while it stays the same
+        """
+        stat = (self.workflows_dir / filename).stat()
+        entry = {
+            'name': workflow.get('name'),
+            'versionId': workflow.get('versionId'),
+            'updatedAt': workflow.get('updatedAt'),
+            'file': filename,
+            'hash': content_hash(data),
+            'content_hash': local_hash,
+            'static_hash': static_hash,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+        }
+        with self.lock:
+            self.workflows[workflow['id']] = entry
+
+    def record_deployed(self, remote_workflow: Dict, file_path: Path, local_hash: str,
+                        static_hash: Optional[str] = None):
+        """Remember the version n8n returned after pushing a local file"""
+        self.record(remote_workflow, file_path.name, file_path.read_bytes(), local_hash,
+                    static_hash)
+
+    def record_restored(self, remote_workflow: Dict, local_hash: Optional[str],
+                        static_hash: Optional[str] = None):
+        """
+        Remember the version a rollback put back in n8n and the hash of its
+        content; the local file is left alone, so it shows as modified locally
+        """
+        with self.lock:
+            entry = self.workflows.get(remote_workflow['id'])
+            if entry is None:
+                return
+            if local_hash is None:
+                # Journal written before snapshots carried the content hash
+                del self.workflows[remote_workflow['id']]
+                return
+            entry.update(versionId=remote_workflow.get('versionId'),
+                         updatedAt=remote_workflow.get('updatedAt'),
+                         content_hash=local_hash, static_hash=static_hash)
+
+    def forget(self, workflow_id: str):
+        """Drop the entry of a workflow removed from n8n"""
+        with self.lock:
+            self.workflows.pop(workflow_id, None)
+
+    def prune(self, seen_ids):
+        """Drop entries for workflows that no longer exist in n8n"""
+        for workflow_id in set(self.workflows) - set(seen_ids):
+            del self.workflows[workflow_id]
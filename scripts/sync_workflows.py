@@ -4,10 +4,18 @@ Sync workflows from n8n to Git repository
 Converts workflow names to kebab-case for file naming
 """
 
-import json
 import re
 import os
-from pathlib import Path
+import instances
+from json_io import dumps_workflow
+from local_index import LocalIndex
+from normalize import Normalizer, configured_rules, get_normalizer
+from pipeline import DEFAULT_JOBS, amap_bounded, map_bounded
+from profiler import profiler
+from safe_write import BatchWriter
+from shard import in_shard
+from sync_state import SyncState, summarize
+from workflow_content import static_data_hash, workflow_hash
 
 def name_to_kebab_case(name: str) -> str:
     """
@@ -28,83 +36,222 @@ def name_to_kebab_case(name: str) -> str:
     name = re.sub(r'[^a-z0-9-]', '', name)
     return name
 
-def sync_workflows_to_git():
-    """Fetch all workflows from n8n and save to git repository"""
+def file_owners(workflows, entries: dict = None) -> tuple:
+    """
+    ({file name: workflow}, [(workflow, file name)] left out) of a listing
     
-    # Import here to avoid circular dependencies
-    from n8n_client import N8nClient
+    Workflows whose names map to the same kebab-case file collide: the last
+    one listed owns the file and the others are not pulled. Resolve over the
+    whole listing before skipping anything, or an unchanged owner could be
+    skipped while an earlier colliding workflow overwrites its file. The
+    entries (workflow id -> state entry) of the workflows left out are
+    dropped, since they would point at a file they no longer own.
+    """
+    owners = {}
+    left_out = []
+    for workflow in workflows:
+        filename = name_to_kebab_case(workflow.get('name', 'unnamed')) + '.json'
+        previous = owners.get(filename)
+        if previous is not None:
+            left_out.append((previous, filename))
+        owners[filename] = workflow
+    if entries is not None:
+        for workflow, _ in left_out:
+            entries.pop(workflow['id'], None)
+    return owners, left_out
+
+def collision_warning(workflow: dict, filename: str, owner: dict) -> str:
+    return (f"⚠️  Name collision: {workflow.get('name')} and {owner.get('name')} → "
+            f"{filename}; keeping {owner.get('name')}")
+
+def clean_workflow(full_workflow: dict, normalizer=None) -> dict:
+    """Remove volatile fields that cause unnecessary diffs (see normalize.py)"""
+    return (normalizer or get_normalizer()).apply(full_workflow)
+
+def write_workflow(writer: BatchWriter, filename: str, workflow: dict, full_workflow: dict,
+                   state: SyncState, index: LocalIndex, committer=None) -> bool:
+    """
+    Save a cleaned workflow to its file and record it in the sync state
     
-    # Initialize n8n client
-    client = N8nClient()
+    The file is replaced atomically, and only if its bytes change; returns
+    True if it was. The caller syncs the writer once per batch. A
+    git_export.GitCommitter, if given, also collects the file for a commit.
+    """
+    with profiler.phase('serialize'):
+        data = dumps_workflow(full_workflow)
+    with profiler.phase('write'):
+        changed = writer.write(filename, data)
+    if committer is not None:
+        committer.add(filename, data)
     
-    # Get workflows directory
-    workflows_dir = Path(__file__).parent.parent / 'workflows'
-    workflows_dir.mkdir(exist_ok=True)
+    with profiler.phase('hash'):
+        local_hash = workflow_hash(full_workflow)
+        state.record(workflow, filename, data, local_hash, static_data_hash(full_workflow))
+        if changed:
+            index.record(filename, data, full_workflow, local_hash)
+    return changed
+
+def sync_workflows_to_git(jobs: int = DEFAULT_JOBS, full: bool = False, engine: str = 'sync',
+                          committer=None, shard=None):
+    """Fetch all workflows from n8n and save to git repository
     
-    # Fetch all workflows
-    print("🔄 Fetching workflows from n8n...")
-    workflows_response = client.list_workflows()
-    workflows = workflows_response.get('data', [])
+    With jobs > 1 the full workflows are fetched concurrently and each file
+    is written as soon as its fetch completes. engine='async' fetches them
+    from a single event loop with AsyncN8nClient, jobs being the number of
+    requests in flight. Only a bounded number of full workflows (twice the
+    requests in flight) is held in memory at any time.
     
-    synced = 0
-    skipped = 0
+    Workflows whose versionId/updatedAt match the local sync state are not
+    fetched again (unless full=True), and files whose cleaned content is
+    byte-identical are not rewritten; the rest are replaced atomically, with
+    one directory fsync at the end. Cleaning applies the normalize rules of
+    the config; the fields removed by each rule are reported at the end.
     
-    for workflow in workflows:
+    With a committer (git_export.GitCommitter) every pulled file that differs
+    from the branch is collected so the caller can commit them in one go.
+    shard=(i, N) only pulls the workflows of that shard (see shard.py).
+    """
+    
+    # Get workflows directory
+    workflows_dir = instances.workflows_dir()
+    workflows_dir.mkdir(parents=True, exist_ok=True)
+    
+    state = SyncState(workflows_dir)
+    index = LocalIndex(workflows_dir)
+    writer = BatchWriter(workflows_dir)
+    normalizer = Normalizer(configured_rules())
+    seen_ids = []
+    
+    def save(workflow, full_workflow):
+        nonlocal synced, unchanged
         workflow_name = workflow.get('name', 'unnamed')
         
-        # Skip archived workflows
-        if workflow.get('isArchived', False):
-            print(f"⏭️  Skipping archived: {workflow_name}")
-            skipped += 1
-            continue
-        
         # Convert name to kebab-case filename
         filename = name_to_kebab_case(workflow_name) + '.json'
-        filepath = workflows_dir / filename
         
-        # Get full workflow details
-        workflow_id = workflow['id']
-        full_workflow = client.get_workflow(workflow_id)
+        if write_workflow(writer, filename, workflow, full_workflow, state, index,
+                          committer):
+            print(f"✅ Saved: {workflow_name} → {filename}")
+            synced += 1
+        else:
+            unchanged += 1
+    
+    def plan(listed):
+        """
+        The listed workflows that need fetching
+        
+        Name collisions are resolved over the whole list (see file_owners)
+        before unchanged workflows are skipped.
+        """
+        nonlocal skipped, unchanged
+        candidates = []
+        for workflow in listed:
+            seen_ids.append(workflow['id'])
+            workflow_name = workflow.get('name', 'unnamed')
+            
+            # Other shards' workflows are left to their runners
+            if not in_shard(name_to_kebab_case(workflow_name), shard):
+                continue
+            
+            # Skip archived workflows
+            if workflow.get('isArchived', False):
+                print(f"⏭️  Skipping archived: {workflow_name}")
+                skipped += 1
+                continue
+            candidates.append(workflow)
+        
+        owners, left_out = file_owners(candidates, state.workflows)
+        for workflow, filename in left_out:
+            print(collision_warning(workflow, filename, owners[filename]))
+            skipped += 1
+        
+        pending = []
+        for filename, workflow in owners.items():
+            # Skip workflows that did not change since the last pull
+            with profiler.phase('compare'):
+                current = not full and state.is_current(workflow, filename)
+            if current:
+                unchanged += 1
+            else:
+                pending.append(workflow)
+        return pending
+    
+    def pull_threaded():
+        # Import here to avoid circular dependencies
+        from n8n_client import N8nClient
+        
+        # Initialize n8n client
+        client = N8nClient(pool_size=jobs)
         
-        # Clean up nested metadata that causes unnecessary diffs
-        # Remove the nested 'project' object from shared array if present
-        if 'shared' in full_workflow and isinstance(full_workflow['shared'], list):
-            for shared_item in full_workflow['shared']:
-                if 'project' in shared_item:
-                    # Keep only essential fields from shared
-                    project_id = shared_item.get('projectId')
-                    shared_item.pop('project', None)
+        def fetch(workflow):
+            # Get full workflow details
+            with profiler.phase('fetch'):
+                full_workflow = client.get_workflow(workflow['id'])
+            with profiler.phase('clean'):
+                return workflow, clean_workflow(full_workflow, normalizer)
         
-        # Remove versionCounter (changes on every edit, not meaningful for version control)
-        full_workflow.pop('versionCounter', None)
+        # Only the id/name/version of each listed workflow is kept
+        listed = [summarize(wf) for wf in profiler.timed_iter('list', client.iter_workflows())]
         
-        # Clean up staticData - remove runtime state that changes on every execution
-        if 'staticData' in full_workflow and isinstance(full_workflow['staticData'], dict):
-            for node_key, node_data in full_workflow['staticData'].items():
-                if isinstance(node_data, dict):
-                    # Remove from direct node level (e.g., Calendar nodes)
-                    node_data.pop('lastTimeChecked', None)
-                    node_data.pop('possibleDuplicates', None)
-                    
-                    # Remove from nested trigger level (e.g., Gmail Trigger)
-                    for trigger_key, trigger_data in node_data.items():
-                        if isinstance(trigger_data, dict):
-                            trigger_data.pop('lastTimeChecked', None)
-                            trigger_data.pop('possibleDuplicates', None)
+        for result in map_bounded(fetch, plan(listed), jobs):
+            save(*result)
+    
+    async def pull_async():
+        from async_n8n_client import AsyncN8nClient
         
-        # Save to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(full_workflow, f, indent=2, ensure_ascii=False)
+        async with AsyncN8nClient(concurrency=jobs) as client:
+            async def fetch(workflow):
+                with profiler.phase('fetch'):
+                    full_workflow = await client.get_workflow(workflow['id'])
+                with profiler.phase('clean'):
+                    return workflow, clean_workflow(full_workflow, normalizer)
+            
+            with profiler.phase('list'):
+                listed = [summarize(workflow) async for workflow in client.iter_workflows()]
+            
+            async for result in amap_bounded(fetch, plan(listed), 2 * jobs):
+                save(*result)
+    
+    # Fetch all workflows, page by page
+    print("🔄 Fetching workflows from n8n...")
+    synced = 0
+    unchanged = 0
+    skipped = 0
+    
+    try:
+        if engine == 'async':
+            import asyncio
+            asyncio.run(pull_async())
+        else:
+            pull_threaded()
         
-        print(f"✅ Saved: {workflow_name} → {filename}")
-        synced += 1
+        state.prune(seen_ids)
+    finally:
+        # Keep what was already pulled even if the run was interrupted
+        writer.sync()
+        state.save()
+        index.save()
     
-    print(f"\n📊 Summary: {synced} synced, {skipped} skipped")
+    print(f"\n📊 Summary: {synced} synced, {unchanged} unchanged, {skipped} skipped")
+    removed = normalizer.removed()
+    if removed:
+        print("🧹 Normalized: " + ', '.join(f"{rule} ×{count}" for rule, count in removed.items()))
     return synced, skipped
 
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Sync workflows from n8n to Git')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                       help='Number of workflows fetched in parallel')
+    parser.add_argument('--full', action='store_true',
+                       help='Fetch every workflow, ignoring the sync state')
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                       help='HTTP engine: thread pool (sync) or asyncio (async, needs aiohttp)')
+    args = parser.parse_args()
+    
     try:
-        sync_workflows_to_git()
+        sync_workflows_to_git(jobs=args.jobs, full=args.full, engine=args.engine)
     except Exception as e:
         print(f"❌ Error: {e}")
         exit(1)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Transactional push: a journal of what a push changed, to undo it quickly
+Before a workflow is updated, the fields the update overwrites are appended
+to workflows/.automomo-journal/<push-id>.jsonl (one compact JSON record per
+line, flushed to disk before the request goes out); created workflows are
+recorded once n8n returns their id. Rolling back restores every snapshot and
+deletes the created workflows, concurrently
+"""
+
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from json_io import dumps_compact, loads
+from workflow_content import build_deploy_data, static_data_hash, workflow_hash
+
+JOURNAL_DIRNAME = '.automomo-journal'
+# Journals kept; older ones are removed when a new push starts
+KEEP_JOURNALS = 20
+
+OPEN = 'open'
+COMMITTED = 'committed'
+ROLLED_BACK = 'rolled-back'
+
+def journal_dir(workflows_dir: Path) -> Path:
+    return Path(workflows_dir) / JOURNAL_DIRNAME
+
+def new_push_id() -> str:
+    """Sortable id: 20260102-153000-a1b2"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+
+class PushJournal:
+    """Append-only record of one push (write side)"""
+
+    def __init__(self, workflows_dir: Path, instance: Optional[str] = None):
+        self.directory = journal_dir(workflows_dir)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.push_id = new_push_id()
+        self.path = self.directory / f"{self.push_id}.jsonl"
+        self.lock = threading.Lock()
+        # Set by the deployer when a workflow fails: stop and roll back
+        self.failed = False
+        self.file = open(self.path, 'ab')
+        self.append({'op': 'begin', 'push': self.push_id, 'instance': instance,
+                     'time': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        prune_journals(self.directory)
+
+    def append(self, record: Dict):
+        """Write one record and make it durable before returning"""
+        line = dumps_compact(record) + b'\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def snapshot(self, remote_full: Dict, update_data: Dict):
+        """Remember the remote values of the fields an update is about to overwrite"""
+        current = build_deploy_data(remote_full)
+        self.append({'op': 'snapshot', 'id': remote_full['id'], 'name': remote_full.get('name'),
+                     'versionId': remote_full.get('versionId'),
+                     'content_hash': workflow_hash(remote_full),
+                     'static_hash': static_data_hash(remote_full),
+                     'before': {key: current[key] for key in update_data if key in current}})
+
+    def updated(self, workflow_id: str, result: Dict):
+        self.append({'op': 'updated', 'id': workflow_id, 'versionId': result.get('versionId')})
+
+    def created(self, result: Dict):
+        self.append({'op': 'created', 'id': result.get('id'), 'name': result.get('name'),
+                     'versionId': result.get('versionId')})
+
+    def release(self):
+        """Close the file of an interrupted push, leaving it open for rollback"""
+        with self.lock:
+            self.file.close()
+
+    def close(self, status: str):
+        self.append({'op': 'end', 'status': status})
+        with self.lock:
+            self.file.close()
+
+def mark_journal(workflows_dir: Path, push_id: str, status: str):
+    """Record the outcome of a rollback run from the command line"""
+    with open(journal_dir(workflows_dir) / f"{push_id}.jsonl", 'ab') as f:
+        f.write(dumps_compact({'op': 'rollback', 'status': status}) + b'\n')
+
+def prune_journals(directory: Path):
+    """Remove the oldest finished journals; open ones are kept until rolled back"""
+    for path in sorted(directory.glob('*.jsonl'))[:-KEEP_JOURNALS]:
+        if read_journal(path)['status'] != OPEN:
+            path.unlink()
+
+def read_journal(path: Path) -> Dict:
+    """
+    Replay a journal file into {'push', 'instance', 'time', 'status',
+    'updates': {id: snapshot}, 'created': {id: record}}
+
+    A line cut short by a crash ends the replay; everything before it counts.
+    """
+    journal = {'push': Path(path).stem, 'instance': None, 'time': None, 'status': OPEN,
+               'updates': {}, 'created': {}}
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                record = loads(line)
+            except ValueError:
+                break
+            op = record.get('op')
+            if op == 'begin':
+                journal.update(instance=record.get('instance'), time=record.get('time'))
+            elif op == 'snapshot':
+                # Only the first snapshot of a workflow is its state before the push
+                journal['updates'].setdefault(record['id'], dict(record, after=None))
+            elif op == 'updated' and record['id'] in journal['updates']:
+                journal['updates'][record['id']]['after'] = record.get('versionId')
+            elif op == 'created':
+                journal['created'][record['id']] = record
+            elif op in ('end', 'rollback'):
+                journal['status'] = record.get('status', journal['status'])
+    return journal
+
+def list_journals(workflows_dir: Path) -> List[Dict]:
+    """Journals of a workflows directory, newest first"""
+    directory = journal_dir(workflows_dir)
+    return [read_journal(path) for path in sorted(directory.glob('*.jsonl'), reverse=True)]
+
+def find_journal(workflows_dir: Path, push_id: str) -> Dict:
+    path = journal_dir(workflows_dir) / f"{push_id}.jsonl"
+    if not path.exists():
+        raise Exception(f"No existe el push {push_id} "
+                        f"(lista los disponibles con ./automomo rollback)")
+    return read_journal(path)
+
+def rollback(journal: Dict, client, jobs: int = 4, force: bool = False,
+             state=None) -> Tuple[int, int, int]:
+    """
+    Restore the workflows a push changed; returns (restored, skipped, errors)
+
+    Each workflow is fetched first: one n8n still holds at its pre-push
+    version needs nothing, and one edited in n8n after the push is left
+    alone unless force. Created workflows are deleted. The sync state, if
+    given, is pointed at the restored versions (the caller saves it): the
+    local files still hold the undone changes, so they show up as modified
+    locally instead of being overwritten by the next pull.
+    """
+    from pipeline import map_bounded
+
+    def restore(snapshot):
+        workflow_id, name = snapshot['id'], snapshot.get('name')
+        try:
+            current = client.get_workflow(workflow_id)
+        except Exception as e:
+            return None, f"❌ {name}: no se pudo leer de n8n ({e})"
+        if current.get('versionId') == snapshot['versionId']:
+            return False, f"⏭️  {name}: ya está en la versión anterior al push"
+        if not force and snapshot['after'] != current.get('versionId'):
+            return False, (f"⚠️  {name}: cambió en n8n después del push; "
+                           f"no se toca (usa --force)")
+        try:
+            result = client.update_workflow(workflow_id, snapshot['before'])
+        except Exception as e:
+            return None, f"❌ Error restaurando {name}: {e}"
+        if state is not None:
+            state.record_restored(dict(result, id=workflow_id), snapshot.get('content_hash'),
+                                  snapshot.get('static_hash'))
+        return True, f"↩️  Restaurado: {name} (ID: {workflow_id})"
+
+    def delete(record):
+        workflow_id, name = record['id'], record.get('name')
+        try:
+            current = client.get_workflow(workflow_id)
+        except Exception:
+            # Already gone (a 404) or unreachable: the delete below tells which
+            current = None
+        if (current is not None and not force and
+                current.get('versionId') != record.get('versionId')):
+            return False, (f"⚠️  {name}: cambió en n8n después del push; "
+                           f"no se elimina (usa --force)")
+        try:
+            client.delete_workflow(workflow_id)
+        except Exception as e:
+            if current is None:
+                return False, f"⏭️  {name}: ya no existe en n8n"
+            return None, f"❌ Error eliminando {name}: {e}"
+        if state is not None:
+            state.forget(workflow_id)
+        return True, f"🗑️  Eliminado: {name} (ID: {workflow_id})"
+
+    tasks = ([(restore, snapshot) for snapshot in journal['updates'].values()] +
+             [(delete, record) for record in journal['created'].values()])
+    restored = skipped = errors = 0
+    # Printed here, in the calling thread, so concurrent restores don't share a line
+    for result, message in map_bounded(lambda task: task[0](task[1]), tasks, jobs):
+        print(message)
+        if result:
+            restored += 1
+        elif result is False:
+            skipped += 1
+        else:
+            errors += 1
+    return restored, skipped, errors
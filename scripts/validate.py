@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Offline validation of the workflow files before they are pushed
+Checks what n8n would reject (shape of nodes, connections and settings) plus
+a few lint rules, without any API call. Results are cached by file content
+hash, so only new or edited files are validated again, and those are spread
+over the CPU cores when there are many
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from json_io import loads
+from local_index import LocalIndex
+from safe_write import write_if_changed
+from sync_state import content_hash
+from workflow_content import ALLOWED_SETTINGS
+
+CACHE_FILENAME = '.automomo-validate.json'
+# Bump when the rules change, so cached results are not reused
+RULES_VERSION = 1
+
+# Below this many files to validate, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Nodes that need no connections: sticky notes, and triggers start a workflow
+# with no incoming edge
+FREE_NODE_TYPES = ('n8n-nodes-base.stickyNote',)
+START_NODE_TYPES = ('n8n-nodes-base.webhook', 'n8n-nodes-base.formTrigger')
+
+def issue(level: str, message: str) -> Dict:
+    return {'level': level, 'message': message}
+
+def is_start_node(node_type: str) -> bool:
+    return node_type.lower().endswith('trigger') or node_type in START_NODE_TYPES
+
+def check_nodes(nodes) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """Issues of the node list and the nodes by name"""
+    issues = []
+    by_name: Dict[str, Dict] = {}
+    ids = set()
+    if not isinstance(nodes, list):
+        return [issue(ERROR, "'nodes' debe ser una lista")], by_name
+
+    for position, node in enumerate(nodes):
+        if not isinstance(node, dict):
+            issues.append(issue(ERROR, f"nodes[{position}] no es un objeto"))
+            continue
+        name = node.get('name')
+        label = f"'{name}'" if isinstance(name, str) and name else f"nodes[{position}]"
+        if not isinstance(name, str) or not name:
+            issues.append(issue(ERROR, f"{label}: falta 'name'"))
+        elif name in by_name:
+            issues.append(issue(ERROR, f"Nombre de nodo duplicado: '{name}'"))
+        else:
+            by_name[name] = node
+        if not isinstance(node.get('type'), str) or not node.get('type'):
+            issues.append(issue(ERROR, f"{label}: falta 'type'"))
+        version = node.get('typeVersion')
+        if isinstance(version, bool) or not isinstance(version, (int, float)):
+            issues.append(issue(ERROR, f"{label}: 'typeVersion' debe ser un número"))
+        coordinates = node.get('position')
+        if (not isinstance(coordinates, list) or len(coordinates) != 2 or
+                not all(isinstance(value, (int, float)) for value in coordinates)):
+            issues.append(issue(ERROR, f"{label}: 'position' debe ser [x, y]"))
+        if not isinstance(node.get('parameters', {}), dict):
+            issues.append(issue(ERROR, f"{label}: 'parameters' debe ser un objeto"))
+        node_id = node.get('id')
+        if node_id is not None:
+            if node_id in ids:
+                issues.append(issue(ERROR, f"{label}: id de nodo duplicado '{node_id}'"))
+            ids.add(node_id)
+    return issues, by_name
+
+def check_connections(connections, by_name: Dict[str, Dict]) -> Tuple[List[Dict], set]:
+    """Issues of the connections and the names of the nodes they touch"""
+    if not isinstance(connections, dict):
+        return [issue(ERROR, "'connections' debe ser un objeto")], set()
+    issues = []
+    connected = set()
+    for source, outputs in connections.items():
+        if source not in by_name:
+            issues.append(issue(ERROR, f"Conexión desde un nodo que no existe: '{source}'"))
+        if not isinstance(outputs, dict):
+            issues.append(issue(ERROR, f"Conexiones de '{source}': deben ser un objeto"))
+            continue
+        for output_type, slots in outputs.items():
+            if not isinstance(slots, list):
+                issues.append(issue(ERROR, f"Conexiones '{output_type}' de '{source}': "
+                                           f"deben ser una lista"))
+                continue
+            for targets in slots:
+                for target in targets or []:
+                    target_name = target.get('node') if isinstance(target, dict) else None
+                    if target_name is None:
+                        issues.append(issue(ERROR, f"Conexión de '{source}' sin 'node'"))
+                    elif target_name not in by_name:
+                        issues.append(issue(ERROR, f"Conexión de '{source}' a un nodo que "
+                                                   f"no existe: '{target_name}'"))
+                    else:
+                        connected.update((source, target_name))
+    return issues, connected
+
+def validate_workflow(workflow) -> List[Dict]:
+    """Issues of a parsed workflow: errors n8n would reject, warnings worth a look"""
+    if not isinstance(workflow, dict):
+        return [issue(ERROR, "El archivo no contiene un objeto JSON")]
+    issues = []
+    if not isinstance(workflow.get('name'), str) or not workflow['name'].strip():
+        issues.append(issue(ERROR, "Falta 'name'"))
+
+    node_issues, by_name = check_nodes(workflow.get('nodes'))
+    issues.extend(node_issues)
+    connection_issues, connected = check_connections(workflow.get('connections', {}), by_name)
+    issues.extend(connection_issues)
+
+    for name, node in by_name.items():
+        node_type = node.get('type') or ''
+        if (name not in connected and node_type not in FREE_NODE_TYPES and
+                not is_start_node(node_type) and len(by_name) > 1):
+            issues.append(issue(WARNING, f"Nodo sin conexiones: '{name}'"))
+
+    settings = workflow.get('settings')
+    if settings is not None and not isinstance(settings, dict):
+        issues.append(issue(ERROR, "'settings' debe ser un objeto"))
+    elif settings:
+        for key in sorted(set(settings) - set(ALLOWED_SETTINGS)):
+            issues.append(issue(WARNING, f"settings.{key} no se despliega "
+                                         f"(push solo envía {', '.join(ALLOWED_SETTINGS)})"))
+    static_data = workflow.get('staticData')
+    if static_data is not None and not isinstance(static_data, dict):
+        issues.append(issue(ERROR, "'staticData' debe ser un objeto o null"))
+    return issues
+
+def validate_file(path: Path) -> Tuple[str, List[Dict]]:
+    """(content hash, issues) of a workflow file; runs in the pool's workers"""
+    data = Path(path).read_bytes()
+    try:
+        workflow = loads(data)
+    except ValueError as e:
+        return content_hash(data), [issue(ERROR, f"JSON inválido: {e}")]
+    return content_hash(data), validate_workflow(workflow)
+
+class ValidationCache:
+    """File content hash -> issues, kept next to the workflows"""
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / CACHE_FILENAME
+        self.results: Dict[str, List[Dict]] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get('rules') == RULES_VERSION:
+            self.results = data.get('results', {})
+
+    def save(self, keep):
+        """Write the cache, dropping the results of contents no longer present"""
+        if not self.path.parent.exists():
+            return
+        self.results = {key: value for key, value in self.results.items() if key in keep}
+        data = {'rules': RULES_VERSION, 'results': self.results}
+        write_if_changed(self.path, json.dumps(data, indent=2, sort_keys=True,
+                                               ensure_ascii=False).encode('utf-8'))
+
+def validate_entries(directory: Path, entries: List[Dict], jobs: Optional[int] = None,
+                     present: Optional[List[Dict]] = None) -> Dict[str, List[Dict]]:
+    """
+    Issues of the given LocalIndex entries, by file name
+
+    Files whose content hash is cached are not read; the rest are validated
+    in a process pool of `jobs` workers (default: one per CPU core). The cache
+    keeps the results of the `present` entries (default: `entries`), so a run
+    over some of the files passes all of them to keep the others' results.
+    """
+    cache = ValidationCache(directory)
+    results = {}
+    pending = []
+    for entry in entries:
+        cached = cache.results.get(entry['hash'])
+        if cached is not None:
+            results[entry['file']] = cached
+        else:
+            pending.append(entry)
+
+    paths = [entry['path'] for entry in pending]
+    if len(paths) >= PARALLEL_MIN_FILES and (jobs or os.cpu_count() or 1) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(jobs or os.cpu_count(), len(paths))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            validated = list(executor.map(validate_file, paths,
+                                          chunksize=max(1, len(paths) // (workers * 4))))
+    else:
+        validated = [validate_file(path) for path in paths]
+
+    hashes = {entry['hash'] for entry in (entries if present is None else present)}
+    for entry, (file_hash, issues) in zip(pending, validated):
+        results[entry['file']] = issues
+        cache.results[file_hash] = issues
+        hashes.add(file_hash)
+    cache.save(hashes)
+    return results
+
+def validate_directory(directory: Path, workflow_names: Optional[List[str]] = None,
+                       jobs: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """Validate the workflow files of a directory (optionally only some names or files)"""
+    index = LocalIndex(directory)
+    present = list(index.refresh().entries())
+    index.save()
+    entries = present
+    if workflow_names:
+        stems = {Path(name).stem for name in workflow_names}
+        entries = [entry for entry in entries
+                   if entry['name'] in workflow_names or entry['stem'] in stems]
+    return validate_entries(directory, entries, jobs, present)
+
+def count_issues(results: Dict[str, List[Dict]]) -> Tuple[int, int]:
+    """(errors, warnings)"""
+    levels = [item['level'] for issues in results.values() for item in issues]
+    return levels.count(ERROR), levels.count(WARNING)
+
+def print_issues(results: Dict[str, List[Dict]], warnings: bool = True):
+    for filename, issues in sorted(results.items()):
+        shown = [item for item in issues if warnings or item['level'] == ERROR]
+        if not shown:
+            continue
+        print(f"\n📄 {filename}")
+        for item in shown:
+            icon = '❌' if item['level'] == ERROR else '⚠️ '
+            print(f"   {icon} {item['message']}")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Watch mode: keep workflows/ and n8n in sync continuously
+One warm client and the sync state stay in memory; n8n is listed on an
+adaptive interval (shorter after a change, doubling while idle) and local
+edits are picked up through inotify when inotify_simple is installed, or by
+stat()ing the files every few seconds otherwise
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import instances
+from local_index import LocalIndex
+from profiler import profiler
+from safe_write import BatchWriter
+from sync_state import SyncState, summarize
+from sync_workflows import clean_workflow, file_owners, write_workflow
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_MAX_INTERVAL = 120.0
+
+# Without inotify, seconds between two stat() scans of workflows/
+LOCAL_POLL_INTERVAL = 2.0
+# Quiet time an editor gets to finish writing a file before it is pushed
+DEBOUNCE_MS = 300
+
+def log(message: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+def open_inotify(directory: Path):
+    """INotify watching directory for finished writes, or None without inotify_simple"""
+    try:
+        from inotify_simple import INotify, flags
+    except ImportError:
+        return None
+    inotify = INotify()
+    inotify.add_watch(str(directory), flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+    return inotify
+
+class Watcher:
+    def __init__(self, interval: float = DEFAULT_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL, push: bool = True):
+        from deploy_to_n8n import WorkflowDeployer
+        from n8n_client import N8nClient
+        from normalize import Normalizer, configured_rules
+
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.push = push
+        self.workflows_dir = instances.workflows_dir()
+        self.workflows_dir.mkdir(parents=True, exist_ok=True)
+
+        self.client = N8nClient()
+        self.state = SyncState(self.workflows_dir)
+        self.index = LocalIndex(self.workflows_dir)
+        self.writer = BatchWriter(self.workflows_dir)
+        self.normalizer = Normalizer(configured_rules(self.client.config))
+        self.deployer = WorkflowDeployer(client=self.client, state=self.state)
+        # Remote versions as of the last list: workflow id -> summary
+        self.remote: Dict[str, Dict] = {}
+        # (id, versionId) pairs already reported as conflicts
+        self.conflicts = set()
+        # (id, owner id) pairs already reported as name collisions
+        self.collisions = set()
+        # (file, content_hash) pairs already pushed or tried: a file whose
+        # deploy failed, conflicted or changed nothing n8n compares is not
+        # retried (nor n8n listed again for it) until its content changes
+        self.attempted = set()
+        self.inotify = None
+
+    def poll_remote(self) -> int:
+        """List n8n and pull the workflows that changed there; returns how many were fetched"""
+        with profiler.phase('list'):
+            listed = [summarize(wf) for wf in self.client.iter_workflows()]
+
+        remote = {wf['id']: wf for wf in listed if not wf.get('isArchived', False)}
+        owners, left_out = file_owners(remote.values(), self.state.workflows)
+        for workflow, filename in left_out:
+            self.report_collision(workflow, filename, owners[filename])
+
+        fetched = 0
+        try:
+            for filename, workflow in owners.items():
+                entry = self.state.get(workflow['id'])
+                if entry and not self.state.remote_changed(entry, workflow):
+                    continue
+                if entry and self.state.local_changed(entry):
+                    self.report_conflict(workflow)
+                    continue
+
+                name = workflow.get('name', 'unnamed')
+                with profiler.phase('fetch'):
+                    full_workflow = self.client.get_workflow(workflow['id'])
+                with profiler.phase('clean'):
+                    full_workflow = clean_workflow(full_workflow, self.normalizer)
+                if write_workflow(self.writer, filename, workflow, full_workflow,
+                                  self.state, self.index):
+                    log(f"📥 Descargado: {name} → {filename}")
+                fetched += 1
+        finally:
+            self.writer.sync()
+
+        self.state.prune([workflow['id'] for workflow in listed])
+        self.remote = remote
+        return fetched
+
+    def pending_local(self) -> List[Dict]:
+        """Index entries of the local files whose content differs from the last sync"""
+        self.index.refresh()
+        by_file = {entry['file']: entry for entry in self.state.workflows.values()}
+        pending = []
+        current = set()
+        for entry in self.index.entries():
+            key = (entry['file'], entry['content_hash'])
+            current.add(key)
+            if not entry['valid'] or key in self.attempted:
+                continue
+            recorded = (self.state.get(entry['id']) if entry['id'] else None) or \
+                by_file.get(entry['file'])
+            if recorded and recorded.get('content_hash') == entry['content_hash']:
+                continue
+            pending.append(entry)
+        # Forget the pairs no local file matches any more
+        self.attempted &= current
+        return pending
+
+    def push_local(self, entries: List[Dict]) -> int:
+        """Push the given local files; returns how many were deployed"""
+        # A fresh list first: a workflow edited in n8n since the last poll is
+        # reported as a conflict instead of being overwritten
+        self.poll_remote()
+        remote_by_name = {wf.get('name'): wf for wf in self.remote.values()}
+        by_file = {entry['file']: entry for entry in self.state.workflows.values()}
+
+        pushed = 0
+        for entry in entries:
+            self.attempted.add((entry['file'], entry['content_hash']))
+            existing = remote_by_name.get(entry['name'])
+            recorded = (self.state.get(entry['id']) if entry['id'] else None) or \
+                by_file.get(entry['file'])
+            if existing and recorded and self.state.remote_changed(recorded, existing):
+                self.report_conflict(existing)
+                continue
+            workflow = self.deployer.read_local_workflow(entry['path'])
+            if workflow is None:
+                continue
+            result, message = self.deployer.deploy_workflow(workflow, remote_by_name)
+            log(message)
+            if result:
+                pushed += 1
+        return pushed
+
+    def report_conflict(self, workflow: Dict):
+        key = (workflow['id'], workflow.get('versionId'))
+        if key not in self.conflicts:
+            self.conflicts.add(key)
+            log(f"⚠️  Conflicto: {workflow.get('name')} cambió en n8n y en Git; "
+                f"no se toca (resuélvelo con pull o push --force)")
+
+    def report_collision(self, workflow: Dict, filename: str, owner: Dict):
+        key = (workflow['id'], owner['id'])
+        if key not in self.collisions:
+            self.collisions.add(key)
+            log(f"⚠️  Colisión de nombres: {workflow.get('name')} y {owner.get('name')} → "
+                f"{filename}; se mantiene {owner.get('name')}")
+
+    def wait_local(self, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds for local edits
+
+        Returns True if files may have changed (with inotify only when a
+        workflow file was written, followed by DEBOUNCE_MS of quiet).
+        """
+        timeout = max(timeout, 0)
+        if self.inotify is None:
+            time.sleep(min(timeout, LOCAL_POLL_INTERVAL))
+            return True
+        events = self.inotify.read(timeout=int(timeout * 1000))
+        if not any(event.name.endswith('.json') and not event.name.startswith('.')
+                   for event in events):
+            return False
+        while self.inotify.read(timeout=DEBOUNCE_MS):
+            pass
+        return True
+
+    def save(self):
+        self.state.save()
+        self.index.save()
+
+    def run(self):
+        """Sync until interrupted (Ctrl+C or SIGTERM)"""
+        if self.push:
+            self.inotify = open_inotify(self.workflows_dir)
+        if self.push and self.inotify is None:
+            log(f"👀 Sin inotify_simple: revisando workflows/ cada {LOCAL_POLL_INTERVAL:g} s")
+
+        interval = self.interval
+        next_poll = time.monotonic()
+        # After a failed push (n8n unreachable...) local edits wait this long
+        next_push = 0.0
+        log(f"👀 Vigilando n8n (cada {self.interval:g}-{self.max_interval:g} s)"
+            + (" y workflows/" if self.push else ""))
+        try:
+            while True:
+                if time.monotonic() >= next_poll:
+                    try:
+                        changed = self.poll_remote()
+                    except Exception as e:
+                        log(f"⚠️  Error consultando n8n: {e}")
+                        changed = 0
+                    if changed:
+                        self.save()
+                    # Back off while nothing changes, react quickly after a change
+                    interval = self.interval if changed else min(interval * 2, self.max_interval)
+                    next_poll = time.monotonic() + interval
+
+                if not self.push:
+                    time.sleep(max(next_poll - time.monotonic(), 0))
+                    continue
+                if not self.wait_local(next_poll - time.monotonic()):
+                    continue
+                if time.monotonic() < next_push:
+                    continue
+                pending = self.pending_local()
+                if not pending:
+                    self.index.save()
+                    continue
+                try:
+                    self.push_local(pending)
+                except Exception as e:
+                    log(f"⚠️  Error subiendo cambios: {e}")
+                    next_push = time.monotonic() + interval
+                self.save()
+                interval = self.interval
+                next_poll = time.monotonic() + interval
+        except KeyboardInterrupt:
+            log("👋 Watch detenido")
+        finally:
+            self.save()
+            if self.inotify is not None:
+                self.inotify.close()
+
+def watch(interval: Optional[float] = None, max_interval: Optional[float] = None,
+          push: bool = True):
+    Watcher(interval or DEFAULT_INTERVAL, max_interval or DEFAULT_MAX_INTERVAL, push).run()
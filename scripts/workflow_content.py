@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Deployable content of a workflow: the fields n8n accepts on create/update
+and a canonical hash over them, used to detect changes without fetching
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, Optional
+
+# Only include fields that n8n accepts in updates
+# name, nodes, connections, settings are the core fields
+# staticData can be included if not None, but causes issues sometimes
+ALLOWED_FIELDS = ('name', 'nodes', 'connections', 'settings')
+
+# Only executionOrder is allowed, other settings are read-only
+ALLOWED_SETTINGS = ('executionOrder',)
+
+def build_deploy_data(local_workflow: Dict) -> Dict:
+    """Fields of a local workflow that n8n accepts in create/update"""
+    deploy_data = {k: v for k, v in local_workflow.items() 
+                  if k in ALLOWED_FIELDS}
+    
+    # Filter settings to only include allowed fields
+    if 'settings' in deploy_data and deploy_data['settings']:
+        deploy_data['settings'] = {k: v for k, v in deploy_data['settings'].items() 
+                                   if k in ALLOWED_SETTINGS}
+    
+    # Add staticData only if it exists and is not None
+    if local_workflow.get('staticData') is not None:
+        deploy_data['staticData'] = local_workflow['staticData']
+    
+    return deploy_data
+
+def has_changes(deploy_data: Dict, remote_full: Dict) -> bool:
+    """True if nodes or connections differ (node order and metadata are ignored)"""
+    from workflow_diff import WorkflowDiff
+    return WorkflowDiff(remote_full, deploy_data).nodes_changed
+
+def canonical_json(data) -> bytes:
+    """Key-sorted, compact serialization: equal content gives equal bytes"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'),
+                      ensure_ascii=False).encode('utf-8')
+
+def workflow_hash(workflow: Dict) -> str:
+    """sha256 over name, nodes, connections, filtered settings and staticData"""
+    return hashlib.sha256(canonical_json(build_deploy_data(workflow))).hexdigest()
+
+def static_data_hash(workflow: Dict) -> Optional[str]:
+    """sha256 of a workflow's staticData (None if it has none)"""
+    if workflow.get('staticData') is None:
+        return None
+    return hashlib.sha256(canonical_json(workflow['staticData'])).hexdigest()
+
+def minimize_deploy_data(deploy_data: Dict, known_static_hashes: Iterable[str]) -> Dict:
+    """
+    Smallest update body n8n accepts for deploy_data
+
+    The update API requires name, nodes, connections and settings; staticData
+    is optional and left out when n8n already holds that content, so n8n
+    keeps its live copy (trigger cursors and the like) untouched.
+    """
+    if 'staticData' in deploy_data and static_data_hash(deploy_data) in known_static_hashes:
+        return {key: value for key, value in deploy_data.items() if key != 'staticData'}
+    return deploy_data
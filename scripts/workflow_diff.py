@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Structural diff between two versions of a workflow
+Nodes are matched by id (or name when they have none) and compared through
+per-node hashes, connections as sets of edges: linear in the size of the
+workflow, insensitive to node order, and it says what changed
+"""
+
+import hashlib
+from typing import Dict, List, Tuple
+from workflow_content import build_deploy_data, canonical_json
+
+# Node fields that only affect how the node is drawn in the editor
+LAYOUT_FIELDS = ('position',)
+
+def node_key(node: Dict) -> str:
+    return node.get('id') or f"name:{node.get('name')}"
+
+def index_nodes(nodes: List[Dict]) -> Dict[str, Dict]:
+    """Nodes by id/name (duplicated keys get a #n suffix so none is lost)"""
+    indexed = {}
+    for node in nodes or []:
+        key = node_key(node)
+        unique, n = key, 1
+        while unique in indexed:
+            n += 1
+            unique = f"{key}#{n}"
+        indexed[unique] = node
+    return indexed
+
+def node_hash(node: Dict, exclude=()) -> str:
+    """sha256 of a node, optionally leaving some fields out"""
+    if exclude:
+        node = {k: v for k, v in node.items() if k not in exclude}
+    return hashlib.sha256(canonical_json(node)).hexdigest()
+
+def connection_edges(connections: Dict) -> set:
+    """{(source, output type, output index, target, input type, input index)}"""
+    edges = set()
+    for source, outputs in (connections or {}).items():
+        for output_type, slots in (outputs or {}).items():
+            for output_index, targets in enumerate(slots or []):
+                for target in targets or []:
+                    edges.add((source, output_type, output_index, target.get('node'),
+                               target.get('type'), target.get('index', 0)))
+    return edges
+
+class WorkflowDiff:
+    """What changes when going from `old` to `new` (deployable content only)"""
+
+    def __init__(self, old: Dict, new: Dict):
+        old = build_deploy_data(old)
+        new = build_deploy_data(new)
+        self.added: List[Dict] = []
+        self.removed: List[Dict] = []
+        # (old node, new node, changed fields)
+        self.modified: List[Tuple[Dict, Dict, List[str]]] = []
+        self.moved: List[Dict] = []
+        self.renamed: List[Tuple[str, str]] = []
+
+        old_nodes = index_nodes(old.get('nodes'))
+        new_nodes = index_nodes(new.get('nodes'))
+        for key, node in new_nodes.items():
+            before = old_nodes.get(key)
+            if before is None:
+                self.added.append(node)
+                continue
+            # Plain equality (C speed) settles the common unchanged case; the
+            # hashes only run for the nodes that differ
+            if before == node:
+                continue
+            if node_hash(before, LAYOUT_FIELDS) == node_hash(node, LAYOUT_FIELDS):
+                self.moved.append(node)
+                continue
+            fields = sorted(field for field in set(before) | set(node)
+                            if field not in LAYOUT_FIELDS and
+                            canonical_json(before.get(field)) != canonical_json(node.get(field)))
+            if 'name' in fields:
+                self.renamed.append((before.get('name'), node.get('name')))
+            self.modified.append((before, node, fields))
+        self.removed = [node for key, node in old_nodes.items() if key not in new_nodes]
+
+        old_edges = connection_edges(old.get('connections'))
+        new_edges = connection_edges(new.get('connections'))
+        self.connections_added = sorted(new_edges - old_edges, key=str)
+        self.connections_removed = sorted(old_edges - new_edges, key=str)
+
+        self.fields = [field for field in ('name', 'settings', 'staticData')
+                       if old.get(field) != new.get(field) and
+                       canonical_json(old.get(field)) != canonical_json(new.get(field))]
+
+    @property
+    def nodes_changed(self) -> bool:
+        """True if nodes or connections differ (what has_changes checks before a push)"""
+        return bool(self.added or self.removed or self.modified or self.moved or
+                    self.connections_added or self.connections_removed)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.nodes_changed and not self.fields
+
+    def summary(self) -> str:
+        """One line, e.g. '+2 nodos, ~1 nodo, 3 conexiones'"""
+        parts = []
+        for count, sign, singular, plural in (
+                (len(self.added), '+', 'nodo', 'nodos'),
+                (len(self.removed), '-', 'nodo', 'nodos'),
+                (len(self.modified), '~', 'nodo', 'nodos'),
+                (len(self.moved), '↔', 'nodo movido', 'nodos movidos')):
+            if count:
+                parts.append(f"{sign}{count} {singular if count == 1 else plural}")
+        edges = len(self.connections_added) + len(self.connections_removed)
+        if edges:
+            parts.append(f"{edges} {'conexión' if edges == 1 else 'conexiones'}")
+        parts.extend(self.fields)
+        return ', '.join(parts) if parts else 'sin cambios'
+
+    def lines(self) -> List[str]:
+        """Detailed, human readable description"""
+        lines = []
+        for node in self.added:
+            lines.append(f"+ Nodo añadido: \"{node.get('name')}\" ({node.get('type')})")
+        for node in self.removed:
+            lines.append(f"- Nodo eliminado: \"{node.get('name')}\" ({node.get('type')})")
+        for before, after, fields in self.modified:
+            label = (f"\"{before.get('name')}\" → \"{after.get('name')}\""
+                     if before.get('name') != after.get('name') else f"\"{after.get('name')}\"")
+            lines.append(f"~ Nodo modificado: {label} ({', '.join(fields)})")
+        for node in self.moved:
+            lines.append(f"↔ Nodo movido: \"{node.get('name')}\"")
+        for edge in self.connections_added:
+            lines.append(f"→ Conexión añadida: {format_edge(edge)}")
+        for edge in self.connections_removed:
+            lines.append(f"← Conexión eliminada: {format_edge(edge)}")
+        for field in self.fields:
+            lines.append(f"~ {field} modificado")
+        return lines
+
+def format_edge(edge: Tuple) -> str:
+    source, output_type, output_index, target, input_type, input_index = edge
+    suffix = '' if (output_type, output_index, input_index) == ('main', 0, 0) else \
+        f" [{output_type} {output_index} → {input_type} {input_index}]"
+    return f"{source} → {target}{suffix}"